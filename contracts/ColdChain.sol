@@ -15,6 +15,18 @@ contract ColdChain {
         string location;
     }
 
+    // Summary of a window of readings aggregated off-chain by the oracle.
+    // The raw readings stay with the oracle; readingsRoot commits to them.
+    struct WindowSummary {
+        uint256 windowStart;
+        uint256 windowEnd;
+        int256 minTemp;
+        int256 maxTemp;
+        int256 meanTempCenti; // mean in hundredths of a degree
+        uint256 count;
+        bytes32 readingsRoot; // Merkle root over the raw readings (sorted-pair keccak256)
+    }
+
     struct Shipment {
         string shipmentID;
         string status; // e.g., "Created", "In-Transit", "Compromised", "Delivered"
@@ -23,6 +35,7 @@ contract ColdChain {
         int256 minTempLimit; // e.g., 2 degrees Celsius
         TempLog[] tempHistory;
         string productDetails;
+        WindowSummary[] windowSummaries;
     }
 
     // --- State Variables ---
@@ -37,6 +50,7 @@ contract ColdChain {
     event TemperatureUpdated(string indexed shipmentID, int256 currentTemp, string location);
     event FaultDetected(string indexed shipmentID, int256 currentTemp, address indexed custodian);
     event CustodyTransferred(string indexed shipmentID, address indexed oldCustodian, address indexed newCustodian);
+    event WindowSummarized(string indexed shipmentID, uint256 windowStart, uint256 windowEnd, int256 minTemp, int256 maxTemp, uint256 count, bytes32 readingsRoot);
 
     // --- Modifiers ---
 
@@ -117,6 +131,57 @@ contract ColdChain {
         return true;
     }
 
+    /**
+     * @dev Records a summary of a window of readings aggregated by the oracle.
+     * @notice Breaches are still reported individually through updateTemperature; the
+     * min/max check here is a safety net in case one was missed.
+     * @param _shipmentID The ID of the shipment.
+     * @param _windowStart Timestamp of the first reading in the window.
+     * @param _windowEnd Timestamp of the last reading in the window.
+     * @param _minTemp Lowest reading in the window.
+     * @param _maxTemp Highest reading in the window.
+     * @param _meanTempCenti Mean of the readings, in hundredths of a degree.
+     * @param _count Number of readings in the window.
+     * @param _readingsRoot Merkle root over the raw readings, kept off-chain by the oracle.
+     */
+    function submitWindowSummary(
+        string memory _shipmentID,
+        uint256 _windowStart,
+        uint256 _windowEnd,
+        int256 _minTemp,
+        int256 _maxTemp,
+        int256 _meanTempCenti,
+        uint256 _count,
+        bytes32 _readingsRoot
+    ) public onlyOracle returns (bool) {
+        Shipment storage targetShipment = shipments[_shipmentID];
+        require(bytes(targetShipment.shipmentID).length > 0, "Shipment does not exist");
+        require(_count > 0 && _minTemp <= _maxTemp, "Invalid window summary");
+        require(_windowStart <= _windowEnd, "Window ends before it starts");
+        require(_meanTempCenti >= _minTemp * 100 && _meanTempCenti <= _maxTemp * 100, "Mean outside min/max");
+
+        targetShipment.windowSummaries.push(WindowSummary({
+            windowStart: _windowStart,
+            windowEnd: _windowEnd,
+            minTemp: _minTemp,
+            maxTemp: _maxTemp,
+            meanTempCenti: _meanTempCenti,
+            count: _count,
+            readingsRoot: _readingsRoot
+        }));
+
+        emit WindowSummarized(_shipmentID, _windowStart, _windowEnd, _minTemp, _maxTemp, _count, _readingsRoot);
+
+        if (_maxTemp > targetShipment.maxTempLimit || _minTemp < targetShipment.minTempLimit) {
+            if (keccak256(abi.encode(targetShipment.status)) != keccak256(abi.encode("Compromised"))) {
+                targetShipment.status = "Compromised";
+                int256 breachTemp = _maxTemp > targetShipment.maxTempLimit ? _maxTemp : _minTemp;
+                emit FaultDetected(_shipmentID, breachTemp, targetShipment.custodian);
+            }
+        }
+        return true;
+    }
+
     /**
      * @dev Transfers custody of a shipment to a new party.
      * @param _shipmentID The ID of the shipment to transfer.
@@ -165,6 +230,19 @@ contract ColdChain {
         return s.tempHistory.length;
     }
 
+    function getWindowSummaryCount(string memory _shipmentID) public view returns (uint256) {
+        Shipment storage s = shipments[_shipmentID];
+        require(bytes(s.shipmentID).length > 0, "Shipment does not exist");
+        return s.windowSummaries.length;
+    }
+
+    function getWindowSummary(string memory _shipmentID, uint256 _index) public view returns (WindowSummary memory) {
+        Shipment storage s = shipments[_shipmentID];
+        require(bytes(s.shipmentID).length > 0, "Shipment does not exist");
+        require(_index < s.windowSummaries.length, "Index out of bounds");
+        return s.windowSummaries[_index];
+    }
+
     function getTempHistoryEntry(string memory _shipmentID, uint256 _index) public view returns (uint256 timestamp, int256 temp, string memory location) {
         Shipment storage s = shipments[_shipmentID];
         require(bytes(s.shipmentID).length > 0, "Shipment does not exist");
@@ -0,0 +1,248 @@
+"""
+Edge aggregation for the IoT oracle.
+
+Instead of one updateTemperature transaction per reading, readings are
+buffered per shipment:
+  - a threshold breach is still sent immediately with updateTemperature,
+  - everything else is rolled into windows that are committed on-chain with
+    submitWindowSummary (min, max, mean, count and a Merkle root over the
+    raw readings).
+The raw readings live in a local SQLite store indexed by shipment and
+window, which can serve Merkle proofs for any single reading.
+
+Leaves are keccak256(abi.encodePacked(shipmentID, timestamp, temp, location))
+and pairs are hashed in sorted order, so proofs verify with OpenZeppelin's
+MerkleProof.verify.
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from web3 import Web3
+
+# Mirrors the limits hard-coded in ColdChain.createShipment
+DEFAULT_MIN_TEMP = 2
+DEFAULT_MAX_TEMP = 8
+
+# --- Merkle tree ---
+
+def leaf_hash(shipment_id: str, timestamp: int, temp: int, location: str) -> bytes:
+    return bytes(Web3.solidity_keccak(['string', 'uint256', 'int256', 'string'],
+                                      [shipment_id, timestamp, temp, location]))
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    return bytes(Web3.keccak(a + b if a <= b else b + a))
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """Sorted-pair Merkle root; an odd node at the end of a level is carried up unchanged."""
+    if not leaves:
+        return b'\x00' * 32
+    level = list(leaves)
+    while len(level) > 1:
+        level = [_hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+    return level[0]
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[bytes]:
+    """Sibling hashes from leaf `index` up to the root."""
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        level = [_hash_pair(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                 for i in range(0, len(level), 2)]
+        index //= 2
+    return proof
+
+def verify_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    computed = leaf
+    for sibling in proof:
+        computed = _hash_pair(computed, sibling)
+    return computed == root
+
+# --- Local store ---
+
+class ReadingStore:
+    """SQLite store of raw readings and the window summaries that commit to them."""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS readings (
+            shipment_id TEXT NOT NULL,
+            window_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            timestamp INTEGER NOT NULL,
+            temp INTEGER NOT NULL,
+            location TEXT NOT NULL,
+            leaf BLOB NOT NULL,
+            PRIMARY KEY (shipment_id, window_id, seq)
+        );
+        CREATE TABLE IF NOT EXISTS windows (
+            shipment_id TEXT NOT NULL,
+            window_id INTEGER NOT NULL,
+            window_start INTEGER NOT NULL,
+            window_end INTEGER NOT NULL,
+            min_temp INTEGER NOT NULL,
+            max_temp INTEGER NOT NULL,
+            mean_temp_centi INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            root BLOB NOT NULL,
+            PRIMARY KEY (shipment_id, window_id)
+        );
+        CREATE INDEX IF NOT EXISTS readings_by_time ON readings (shipment_id, timestamp);
+    """
+
+    def __init__(self, path: str = 'readings.db'):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.executescript(self.SCHEMA)
+
+    def next_window_id(self, shipment_id: str) -> int:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(window_id) FROM windows WHERE shipment_id = ?", (shipment_id,)).fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def save_window(self, shipment_id: str, window_id: int, readings: List[Tuple], leaves: List[bytes],
+                    summary: Dict):
+        """Writes a closed window and its raw readings in one transaction."""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO readings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(shipment_id, window_id, seq, ts, temp, location, leaf)
+                 for seq, ((ts, temp, location), leaf) in enumerate(zip(readings, leaves))])
+            self.conn.execute(
+                "INSERT INTO windows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (shipment_id, window_id, summary['windowStart'], summary['windowEnd'], summary['minTemp'],
+                 summary['maxTemp'], summary['meanTempCenti'], summary['count'], summary['root']))
+
+    def proof(self, shipment_id: str, window_id: int, seq: int) -> Optional[Dict]:
+        """A reading plus the Merkle proof tying it to its window's on-chain root."""
+        with self.lock:
+            window = self.conn.execute(
+                "SELECT root FROM windows WHERE shipment_id = ? AND window_id = ?",
+                (shipment_id, window_id)).fetchone()
+            rows = self.conn.execute(
+                "SELECT seq, timestamp, temp, location, leaf FROM readings "
+                "WHERE shipment_id = ? AND window_id = ? ORDER BY seq",
+                (shipment_id, window_id)).fetchall()
+        if window is None or not 0 <= seq < len(rows):
+            return None
+        leaves = [row[4] for row in rows]
+        _, timestamp, temp, location, leaf = rows[seq]
+        return {
+            'shipmentId': shipment_id,
+            'windowId': window_id,
+            'seq': seq,
+            'reading': {'timestamp': timestamp, 'temp': temp, 'location': location},
+            'leaf': '0x' + leaf.hex(),
+            'proof': ['0x' + p.hex() for p in merkle_proof(leaves, seq)],
+            'root': '0x' + window[0].hex()
+        }
+
+    def close(self):
+        self.conn.close()
+
+# --- Aggregator ---
+
+class _Window:
+    def __init__(self, window_id: int, started_at: int):
+        self.window_id = window_id
+        self.started_at = started_at
+        self.readings: List[Tuple[int, int, str]] = [] # (timestamp, temp, location)
+
+class Aggregator:
+    """
+    Buffers readings per shipment. The first reading of each breach goes out
+    immediately; a window is summarized when it is `window_seconds` old or
+    holds `max_readings`.
+    """
+    def __init__(self, submitter, store: ReadingStore,
+                 window_seconds: float = 300, max_readings: int = 100,
+                 min_temp: int = DEFAULT_MIN_TEMP, max_temp: int = DEFAULT_MAX_TEMP):
+        self.submitter = submitter
+        self.store = store
+        self.window_seconds = window_seconds
+        self.max_readings = max_readings
+        self.min_temp = min_temp
+        self.max_temp = max_temp
+        self.windows: Dict[str, _Window] = {}
+        self.next_window_ids: Dict[str, int] = {}
+        self.in_breach: Dict[str, bool] = {}
+        self.lock = threading.Lock()
+        self.stats = {'readings': 0, 'breaches': 0, 'breachesSent': 0, 'summaries': 0}
+
+    def add_reading(self, shipment_id: str, temp: int, location: str, timestamp: Optional[int] = None):
+        timestamp = int(timestamp if timestamp is not None else time.time())
+        closed = []
+        with self.lock:
+            self.stats['readings'] += 1
+            window = self.windows.get(shipment_id)
+            if window is not None and timestamp - window.started_at >= self.window_seconds:
+                closed.append(self.windows.pop(shipment_id))
+                window = None
+            if window is None:
+                window = self._open(shipment_id, timestamp)
+            window.readings.append((timestamp, temp, location))
+            if len(window.readings) >= self.max_readings:
+                closed.append(self.windows.pop(shipment_id))
+            is_breach = temp > self.max_temp or temp < self.min_temp
+            # Only the first reading of an excursion goes out on its own; the
+            # rest of it is still captured by the window's min/max.
+            send_breach = is_breach and not self.in_breach.get(shipment_id, False)
+            self.in_breach[shipment_id] = is_breach
+            if is_breach:
+                self.stats['breaches'] += 1
+            if send_breach:
+                self.stats['breachesSent'] += 1
+
+        if send_breach:
+            self.submitter.submit(shipment_id, temp, location)
+        for window in closed:
+            self._commit(shipment_id, window)
+
+    def flush(self, now: Optional[float] = None):
+        """Commits every window that is due; with no `now`, commits all open windows."""
+        with self.lock:
+            due = [(shipment_id, window) for shipment_id, window in self.windows.items()
+                   if now is None or now - window.started_at >= self.window_seconds]
+            for shipment_id, _ in due:
+                del self.windows[shipment_id]
+        for shipment_id, window in due:
+            self._commit(shipment_id, window)
+
+    def _open(self, shipment_id: str, timestamp: int) -> _Window:
+        # Ids are handed out here rather than read back from the store, since
+        # the previous window may still be on its way to disk.
+        window_id = self.next_window_ids.get(shipment_id)
+        if window_id is None:
+            window_id = self.store.next_window_id(shipment_id)
+        self.next_window_ids[shipment_id] = window_id + 1
+        window = _Window(window_id, timestamp)
+        self.windows[shipment_id] = window
+        return window
+
+    def _commit(self, shipment_id: str, window: _Window):
+        readings = window.readings
+        leaves = [leaf_hash(shipment_id, ts, temp, location) for ts, temp, location in readings]
+        temps = [temp for _, temp, _ in readings]
+        summary = {
+            'windowStart': readings[0][0],
+            'windowEnd': readings[-1][0],
+            'minTemp': min(temps),
+            'maxTemp': max(temps),
+            'meanTempCenti': round(sum(temps) * 100 / len(temps)),
+            'count': len(temps),
+            'root': merkle_root(leaves)
+        }
+        # Persist first: the on-chain root must never refer to readings we lost.
+        self.store.save_window(shipment_id, window.window_id, readings, leaves, summary)
+        self.submitter.submit_call(
+            'submitWindowSummary',
+            (shipment_id, summary['windowStart'], summary['windowEnd'], summary['minTemp'],
+             summary['maxTemp'], summary['meanTempCenti'], summary['count'], summary['root']),
+            f"window {window.window_id} of '{shipment_id}' ({summary['count']} readings)")
+        with self.lock:
+            self.stats['summaries'] += 1
@@ -1,52 +1,32 @@
+"""
+IoT oracle: pushes temperature readings to the ColdChain contract.
+
+Readings go through a pipelined submitter instead of one blocking
+round trip at a time:
+  1. nonces are tracked locally and chain id / gas price are cached,
+  2. a pool of workers signs and sends readings for many shipments at once,
+  3. a separate confirmer thread watches for new blocks, fetches receipts
+     only for the nonces they mined, and replaces the transaction holding
+     up the account's next nonce with a higher gas price.
+
+Run against Ganache (configured in .env):
+    python iot_oracle.py --shipments SHIP001,SHIP002
+or fully in-process, to measure readings per second:
+    python iot_oracle.py --local --shipments 20 --rounds 50
+With --aggregate, only breaches are sent individually; other readings are
+committed as windowed summaries (see aggregator.py).
+"""
 import os
 import json
+import math
 import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from dotenv import load_dotenv
 
-# --- Load Configuration from .env file ---
-load_dotenv()
-GANACHE_RPC_URL = os.getenv("GANACHE_RPC_URL")
-CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
-ORACLE_PRIVATE_KEY = os.getenv("ORACLE_PRIVATE_KEY")
-if not ORACLE_PRIVATE_KEY:
-    print("Error: ORACLE_PRIVATE_KEY not found in .env file.")
-    exit()
-
-# --- Web3 Setup ---
-w3 = Web3(Web3.HTTPProvider(GANACHE_RPC_URL))
-if not w3.is_connected():
-    print(f"Failed to connect to Ganache at {GANACHE_RPC_URL}")
-    exit()
-print(f"Successfully connected to Ganache.")
-
-# --- DERIVE ORACLE ADDRESS (MOVED HERE) ---
-# Now that we have a 'w3' instance, we can derive the public address
-try:
-    ORACLE_ADDRESS = w3.eth.account.from_key(ORACLE_PRIVATE_KEY).address
-except Exception as e:
-    print(f"Error deriving address from private key: {e}")
-    print("Please ensure ORACLE_PRIVATE_KEY in your .env file is correct and does NOT have a '0x' prefix.")
-    exit()
-
-
-# --- Load Contract ABI ---
-try:
-    with open('abi.json', 'r') as f:
-        contract_info = json.load(f)
-        CONTRACT_ABI = contract_info['abi']
-except FileNotFoundError:
-    print("Error: abi.json not found. Make sure it's in the same directory.")
-    exit()
-except KeyError:
-    print("Error: 'abi' key not found in abi.json. Make sure the file format is correct.")
-    exit()
-
-
-# --- Contract Instance ---
-contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=CONTRACT_ABI)
-print(f"Connected to ColdChain contract at address: {CONTRACT_ADDRESS}")
-
 # --- Simulation Data ---
 SHIPMENT_ID = "SHIP001"
 TEMPERATURE_DATA = [
@@ -60,54 +40,446 @@ TEMPERATURE_DATA = [
 ]
 INTERVAL_SECONDS = 5
 
-def send_temperature_update(shipment_id, current_temp, location):
-    """Builds, signs, and sends a transaction to the updateTemperature function."""
-    print(f"\n---> Sending Temp Update for '{shipment_id}': {current_temp}°C at '{location}'")
-    
-    try:
-        nonce = w3.eth.get_transaction_count(ORACLE_ADDRESS)
-        txn_dict = contract.functions.updateTemperature(
-            shipment_id,
-            current_temp,
-            location
-        ).build_transaction({
-            'chainId': w3.eth.chain_id,
-            'gas': 200000,
-            'gasPrice': w3.eth.gas_price,
+GAS_LIMIT = 200000
+FILLER_GAS_LIMIT = 21000
+
+def load_abi(path: str = 'abi.json') -> list:
+    with open(path, 'r') as f:
+        return json.load(f)['abi']
+
+# --- Nonces and chain parameters ---
+
+class NonceManager:
+    """Hands out nonces locally so sending never waits on get_transaction_count."""
+    def __init__(self, w3: Web3, address: str):
+        self.w3 = w3
+        self.address = address
+        self.lock = threading.Lock()
+        self.next_nonce = w3.eth.get_transaction_count(address, 'pending')
+
+    def allocate(self) -> int:
+        with self.lock:
+            nonce = self.next_nonce
+            self.next_nonce += 1
+            return nonce
+
+    def resync(self):
+        """Skips ahead if the chain has seen nonces we did not hand out (e.g. another sender)."""
+        chain_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+        with self.lock:
+            self.next_nonce = max(self.next_nonce, chain_nonce)
+
+class ChainParams:
+    """Caches the chain id for good and the gas price for `gas_price_ttl` seconds."""
+    def __init__(self, w3: Web3, gas_price_ttl: float = 15.0):
+        self.w3 = w3
+        self.chain_id = w3.eth.chain_id
+        self.gas_price_ttl = gas_price_ttl
+        self.lock = threading.Lock()
+        self._gas_price = None
+        self._fetched_at = 0.0
+
+    def gas_price(self) -> int:
+        with self.lock:
+            if self._gas_price is None or time.monotonic() - self._fetched_at > self.gas_price_ttl:
+                self._gas_price = self.w3.eth.gas_price
+                self._fetched_at = time.monotonic()
+            return self._gas_price
+
+# --- Submitter ---
+
+class PendingTx:
+    """A sent transaction awaiting its receipt; `hashes` includes every replacement."""
+    def __init__(self, nonce: int, tx_dict: dict, tx_hash: str, label: str):
+        self.nonce = nonce
+        self.tx_dict = tx_dict
+        self.hashes = [tx_hash]
+        self.label = label
+        self.last_sent = time.monotonic()
+        self.lowest_since = None # when this became the account's next nonce to be mined
+        self.replacements = 0
+
+class OracleSubmitter:
+    def __init__(self, w3: Web3, contract, private_key: str,
+                 send_workers: int = 8,
+                 poll_interval: float = 0.25,
+                 stuck_after: float = 30.0,
+                 max_replacements: int = 3,
+                 gas_bump: float = 1.125,
+                 max_send_attempts: int = 3,
+                 verbose: bool = True):
+        self.w3 = w3
+        self.contract = contract
+        self.private_key = private_key
+        self.address = w3.eth.account.from_key(private_key).address
+        self.nonces = NonceManager(w3, self.address)
+        self.params = ChainParams(w3)
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.max_replacements = max_replacements
+        self.gas_bump = gas_bump
+        self.max_send_attempts = max_send_attempts
+        self.verbose = verbose
+
+        self.senders = ThreadPoolExecutor(max_workers=send_workers, thread_name_prefix="oracle-send")
+        self.in_flight = {}  # nonce -> PendingTx
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.outstanding = 0 # readings submitted but not yet confirmed or failed
+        self.stats = {'submitted': 0, 'sent': 0, 'confirmed': 0, 'reverted': 0,
+                      'replaced': 0, 'failed': 0, 'fillers': 0}
+        self.started_at = time.monotonic()
+        self.last_confirmed_at = None
+        self.running = True
+        self.confirmer = threading.Thread(target=self._confirm_loop, name="oracle-confirm", daemon=True)
+        self.confirmer.start()
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+
+    # --- Stage 1+2: sign and send ---
+
+    def submit(self, shipment_id: str, current_temp: int, location: str):
+        """Queues a reading for updateTemperature; returns immediately."""
+        self.submit_call('updateTemperature', (shipment_id, current_temp, location),
+                         f"'{shipment_id}': {current_temp}°C at '{location}'")
+
+    def submit_call(self, function_name: str, args: tuple, label: str):
+        """Queues a call of any oracle-only contract function; returns immediately."""
+        with self.lock:
+            self.stats['submitted'] += 1
+            self.outstanding += 1
+        self.senders.submit(self._sign_and_send, function_name, args, label)
+
+    def _build(self, function_name: str, args: tuple, nonce: int, gas_price: int) -> dict:
+        return self.contract.functions[function_name](*args).build_transaction({
+            'from': self.address,
+            'chainId': self.params.chain_id,
+            'gas': GAS_LIMIT,
+            'gasPrice': gas_price,
             'nonce': nonce
         })
 
-        signed_txn = w3.eth.account.sign_transaction(txn_dict, private_key=ORACLE_PRIVATE_KEY)
-        
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        print(f"Transaction sent! Hash: {tx_hash.hex()}")
-        
-        receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-        print(f"Transaction confirmed in block number: {receipt.blockNumber}")
-        if receipt.status == 0:
-            print("Transaction FAILED! Check contract logic or parameters.")
-        else:
-            print("Transaction successful.")
-
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        print("This could be because the shipment ID doesn't exist yet (create it from the DApp first) or a contract revert.")
+    def _send(self, tx_dict: dict) -> str:
+        signed_txn = self.w3.eth.account.sign_transaction(tx_dict, private_key=self.private_key)
+        return self.w3.eth.send_raw_transaction(signed_txn.raw_transaction).to_0x_hex()
+
+    def _sign_and_send(self, function_name: str, args: tuple, label: str):
+        nonce = self.nonces.allocate()
+        tx_dict = None
+        for attempt in range(1, self.max_send_attempts + 1):
+            try:
+                tx_dict = self._build(function_name, args, nonce, self.params.gas_price())
+                tx_hash = self._send(tx_dict)
+            except Exception as e:
+                message = str(e).lower()
+                if 'nonce too low' in message:
+                    # Someone else used this nonce; move past it and take a fresh one.
+                    self.nonces.resync()
+                    nonce = self.nonces.allocate()
+                    continue
+                self._log(f"Send attempt {attempt} for {label} failed: {e}")
+                continue
+            with self.lock:
+                self.in_flight[nonce] = PendingTx(nonce, tx_dict, tx_hash, label)
+                self.stats['sent'] += 1
+            self._log(f"---> Sent {label} (nonce {nonce}, hash {tx_hash})")
+            return
+
+        # Giving up would leave a gap that blocks every later nonce, so plug it.
+        self._log(f"An error occurred sending {label}; plugging nonce {nonce} with a filler transaction.")
+        self._send_filler(nonce)
+        self._finish('failed')
+
+    def _send_filler(self, nonce: int):
+        filler = {
+            'from': self.address,
+            'to': self.address,
+            'value': 0,
+            'chainId': self.params.chain_id,
+            'gas': FILLER_GAS_LIMIT,
+            'gasPrice': self.params.gas_price(),
+            'nonce': nonce
+        }
+        try:
+            self._send(filler)
+            with self.lock:
+                self.stats['fillers'] += 1
+        except Exception as e:
+            self._log(f"Filler for nonce {nonce} failed: {e}")
+
+    # --- Stage 3: confirm ---
+
+    def _confirm_loop(self):
+        last_block = None
+        chain_nonce = 0 # nonces below this are mined
+        while self.running:
+            try:
+                block = self.w3.eth.block_number
+                if block != last_block:
+                    last_block = block
+                    chain_nonce = self.w3.eth.get_transaction_count(self.address, 'latest')
+                # Checked on every poll, not only on a new block: a send can
+                # register its nonce after the block that mined it was seen,
+                # and on an automining chain no later block may come.
+                with self.lock:
+                    mined = sorted((tx for tx in self.in_flight.values() if tx.nonce < chain_nonce),
+                                   key=lambda tx: tx.nonce)
+                for tx in mined:
+                    self._settle(tx)
+            except Exception as e:
+                self._log(f"Polling the chain failed: {e}")
+            # Later nonces cannot be mined before the account's next one, so
+            # only that one is ever a candidate for replacement. If it is not
+            # in flight, it is still being sent and there is nothing to replace.
+            with self.lock:
+                next_tx = self.in_flight.get(chain_nonce)
+            if next_tx is not None:
+                self._check_stuck(next_tx)
+            time.sleep(self.poll_interval)
+
+    def _settle(self, tx: PendingTx):
+        """Records the outcome of a mined nonce."""
+        for tx_hash in reversed(tx.hashes):
+            try:
+                receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            with self.lock:
+                self.in_flight.pop(tx.nonce, None)
+            if receipt.status == 0:
+                self._log(f"Transaction for {tx.label} FAILED in block {receipt.blockNumber}.")
+                self._finish('reverted')
+            else:
+                self._log(f"Confirmed {tx.label} in block {receipt.blockNumber}.")
+                self._finish('confirmed')
+            return
+
+        # The nonce was used by a transaction we did not send
+        with self.lock:
+            self.in_flight.pop(tx.nonce, None)
+        self._log(f"Nonce {tx.nonce} for {tx.label} was used by another transaction.")
+        self._finish('failed')
+
+    def _check_stuck(self, tx: PendingTx):
+        now = time.monotonic()
+        if tx.lowest_since is None:
+            tx.lowest_since = now
+        if now - max(tx.last_sent, tx.lowest_since) >= self.stuck_after:
+            self._replace(tx)
+
+    def _replace(self, tx: PendingTx):
+        """Re-sends a stuck nonce with a bumped gas price."""
+        if tx.replacements >= self.max_replacements:
+            with self.lock:
+                self.in_flight.pop(tx.nonce, None)
+            self._log(f"Giving up on {tx.label} (nonce {tx.nonce}) after {tx.replacements} replacements.")
+            self._finish('failed')
+            return
+
+        bumped = dict(tx.tx_dict)
+        bumped['gasPrice'] = max(math.ceil(tx.tx_dict['gasPrice'] * self.gas_bump), self.params.gas_price())
+        try:
+            tx_hash = self._send(bumped)
+        except Exception as e:
+            # "already known" / "nonce too low" usually mean the original just got mined.
+            self._log(f"Replacement for nonce {tx.nonce} not sent: {e}")
+            tx.last_sent = time.monotonic()
+            return
+        tx.tx_dict = bumped
+        tx.hashes.append(tx_hash)
+        tx.replacements += 1
+        tx.last_sent = time.monotonic()
+        with self.lock:
+            self.stats['replaced'] += 1
+        self._log(f"Replaced stuck nonce {tx.nonce} with gas price {bumped['gasPrice']} ({tx_hash}).")
+
+    def _finish(self, outcome: str):
+        with self.idle:
+            self.stats[outcome] += 1
+            self.outstanding -= 1
+            if outcome == 'confirmed':
+                self.last_confirmed_at = time.monotonic()
+            if self.outstanding == 0:
+                self.idle.notify_all()
+
+    # --- Lifecycle ---
+
+    def drain(self, timeout: float = None) -> bool:
+        """Waits until every submitted reading is confirmed or has failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.idle:
+            while self.outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.idle.wait(remaining)
+        return True
+
+    def close(self):
+        self.senders.shutdown(wait=True)
+        self.running = False
+        self.confirmer.join()
+
+    def report(self) -> dict:
+        with self.lock:
+            stats = dict(self.stats)
+            end = self.last_confirmed_at or time.monotonic()
+        elapsed = max(end - self.started_at, 1e-9)
+        stats['elapsedSeconds'] = round(elapsed, 3)
+        stats['readingsPerSecond'] = round(stats['confirmed'] / elapsed, 1)
+        return stats
+
+# --- Running ---
+
+def run(submitter: OracleSubmitter, shipment_ids, rounds: int, interval: float, timeout: float,
+        aggregator=None) -> dict:
+    """
+    Each round sends one reading per shipment, cycling through TEMPERATURE_DATA.
+    Rounds are paced by `interval` only; nothing waits on receipts until the end.
+    With an aggregator, readings go through it instead of straight on-chain.
+    """
+    for r in range(rounds):
+        data = TEMPERATURE_DATA[r % len(TEMPERATURE_DATA)]
+        for shipment_id in shipment_ids:
+            if aggregator:
+                aggregator.add_reading(shipment_id, data["temp"], data["location"])
+            else:
+                submitter.submit(shipment_id, data["temp"], data["location"])
+        if aggregator:
+            aggregator.flush(now=time.time())
+        if interval and r < rounds - 1:
+            time.sleep(interval)
+    if aggregator:
+        aggregator.flush()
+    if not submitter.drain(timeout):
+        print(f"Timed out after {timeout}s with readings still unconfirmed.")
+
+    report = submitter.report()
+    if aggregator:
+        report.update(aggregator.stats)
+        report['readingsPerTransaction'] = round(aggregator.stats['readings'] / max(report['submitted'], 1), 1)
+        report['readingsPerSecond'] = round(aggregator.stats['readings'] / report['elapsedSeconds'], 1)
+    return report
+
+def connect_from_env():
+    """Loads .env and returns (w3, contract, private_key) for Ganache, exiting on bad config."""
+    load_dotenv()
+    ganache_rpc_url = os.getenv("GANACHE_RPC_URL")
+    contract_address = os.getenv("CONTRACT_ADDRESS")
+    private_key = os.getenv("ORACLE_PRIVATE_KEY")
+    if not private_key:
+        print("Error: ORACLE_PRIVATE_KEY not found in .env file.")
+        exit()
+
+    w3 = Web3(Web3.HTTPProvider(ganache_rpc_url))
+    if not w3.is_connected():
+        print(f"Failed to connect to Ganache at {ganache_rpc_url}")
+        exit()
+    print(f"Successfully connected to Ganache.")
+
+    try:
+        contract = w3.eth.contract(address=contract_address, abi=load_abi())
+    except FileNotFoundError:
+        print("Error: abi.json not found. Make sure it's in the same directory.")
+        exit()
+    except KeyError:
+        print("Error: 'abi' key not found in abi.json. Make sure the file format is correct.")
+        exit()
+    print(f"Connected to ColdChain contract at address: {contract_address}")
+    return w3, contract, private_key
+
+def connect_local(stall_rate: float):
+    """An in-process chain stand-in (see local_chain.py) with a throwaway oracle key."""
+    from local_chain import local_web3
+
+    w3 = local_web3(stall_rate=stall_rate)
+    account = w3.eth.account.create()
+    contract_address = w3.eth.account.create().address
+    contract = w3.eth.contract(address=contract_address, abi=load_abi())
+    print("Using the in-process LocalChain stand-in.")
+    return w3, contract, account.key.hex()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IoT oracle for the ColdChain contract.")
+    parser.add_argument('--local', action='store_true', help="Use the in-process chain stand-in instead of Ganache.")
+    parser.add_argument('--shipments', default=SHIPMENT_ID,
+                        help="Comma-separated shipment IDs, or a count to generate SHIP001..SHIPnnn.")
+    parser.add_argument('--rounds', type=int, default=len(TEMPERATURE_DATA), help="Readings per shipment.")
+    parser.add_argument('--interval', type=float, default=None,
+                        help=f"Seconds between rounds (default {INTERVAL_SECONDS}, or 0 with --local).")
+    parser.add_argument('--workers', type=int, default=8, help="Concurrent signing/sending workers.")
+    parser.add_argument('--stuck-after', type=float, default=30.0,
+                        help="Seconds without a receipt before a nonce is replaced.")
+    parser.add_argument('--stall-rate', type=float, default=0.0,
+                        help="--local only: fraction of transactions that get stuck until replaced.")
+    parser.add_argument('--timeout', type=float, default=300.0, help="Seconds to wait for the last receipts.")
+    parser.add_argument('--quiet', action='store_true', help="Only print the final report.")
+    parser.add_argument('--aggregate', action='store_true',
+                        help="Send breaches immediately and everything else as windowed summaries.")
+    parser.add_argument('--window', type=float, default=300.0, help="--aggregate: window length in seconds.")
+    parser.add_argument('--window-readings', type=int, default=100,
+                        help="--aggregate: close a window early once it holds this many readings.")
+    parser.add_argument('--store', default='readings.db', help="--aggregate: SQLite file for the raw readings.")
+    parser.add_argument('--proof', metavar='SHIPMENT:WINDOW:SEQ',
+                        help="Print the Merkle proof for one stored reading and exit.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.proof:
+        from aggregator import ReadingStore
+
+        shipment_id, window_id, seq = args.proof.rsplit(':', 2)
+        proof = ReadingStore(args.store).proof(shipment_id, int(window_id), int(seq))
+        print(json.dumps(proof, indent=2) if proof else "No such reading in the store.")
+        return
+
+    if args.shipments.isdigit():
+        shipment_ids = [f"SHIP{i:03d}" for i in range(1, int(args.shipments) + 1)]
+    else:
+        shipment_ids = [s for s in args.shipments.split(',') if s]
+    interval = args.interval if args.interval is not None else (0 if args.local else INTERVAL_SECONDS)
+
+    if args.local:
+        w3, contract, private_key = connect_local(args.stall_rate)
+    else:
+        w3, contract, private_key = connect_from_env()
+
+    submitter = OracleSubmitter(w3, contract, private_key,
+                                send_workers=args.workers,
+                                stuck_after=args.stuck_after,
+                                verbose=not args.quiet)
 
-if __name__ == "__main__":
     print("\n" + "="*50)
     print("          IoT Oracle Simulator Started")
     print("="*50)
-    print(f"Oracle Address: {ORACLE_ADDRESS}")
-    print(f"Simulating for Shipment ID: '{SHIPMENT_ID}'")
-    print(f"NOTE: You must create this shipment from the DApp (as the Manufacturer) before this script can update it.")
-    
-    input("\n>>> Press Enter to start sending temperature data once the shipment is created in the DApp... <<<\n")
+    print(f"Oracle Address: {submitter.address}")
+    print(f"Simulating for Shipment IDs: {', '.join(shipment_ids)}")
+    if not args.local:
+        print(f"NOTE: You must create these shipments from the DApp (as the Manufacturer) before this script can update them.")
+        input("\n>>> Press Enter to start sending temperature data once the shipments are created in the DApp... <<<\n")
+
+    aggregator = None
+    if args.aggregate:
+        from aggregator import Aggregator, ReadingStore
 
-    for data in TEMPERATURE_DATA:
-        send_temperature_update(SHIPMENT_ID, data["temp"], data["location"])
-        print(f"Waiting for {INTERVAL_SECONDS} seconds...")
-        time.sleep(INTERVAL_SECONDS)
+        aggregator = Aggregator(submitter, ReadingStore(args.store),
+                                window_seconds=args.window, max_readings=args.window_readings)
+
+    try:
+        report = run(submitter, shipment_ids, args.rounds, interval, args.timeout, aggregator)
+    finally:
+        submitter.close()
+        if aggregator:
+            aggregator.store.close()
 
     print("\n" + "="*50)
     print("          IoT Oracle simulation complete.")
-    print("="*50)
\ No newline at end of file
+    print("="*50)
+    for key, value in report.items():
+        print(f"{key:>18}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+An in-process stand-in for an Ethereum node, for exercising the oracle
+without Ganache.
+
+LocalChainProvider is a web3 provider that answers the JSON-RPC calls the
+oracle makes (chain id, gas price, nonces, raw transaction submission and
+receipts). It keeps a per-sender nonce-ordered pool, mines a block every
+`block_time` seconds and enforces the usual replacement rules
+("nonce too low", "replacement transaction underpriced").
+It does NOT execute contract code: every mined transaction succeeds.
+
+`stall_rate` makes a fraction of transactions never get mined until they
+are replaced with a higher gas price, which is how stuck nonces look on a
+real network.
+"""
+import random
+import threading
+import time
+
+import rlp
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+# Replacements must pay at least 10% more, like geth
+REPLACEMENT_BUMP = 1.10
+
+def _hex(value: int) -> str:
+    return hex(value)
+
+class LocalChainProvider(BaseProvider):
+    def __init__(self, chain_id: int = 1337, gas_price: int = 1_000_000_000,
+                 block_time: float = 0.2, stall_rate: float = 0.0, seed: int = 0):
+        super().__init__()
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.block_time = block_time
+        self.stall_rate = stall_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        self.block_number = 0
+        self.next_block_at = time.monotonic() + block_time
+        self.mined_nonces = {}  # sender -> next nonce to be mined
+        self.pending = {}       # sender -> {nonce: tx}
+        self.receipts = {}      # tx hash -> receipt
+        self.requests = 0
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return True
+
+    # --- JSON-RPC ---
+
+    def make_request(self, method, params):
+        with self.lock:
+            self.requests += 1
+            self._mine_due_blocks()
+            handler = getattr(self, f"_rpc_{method}", None)
+            if handler is None:
+                return {'jsonrpc': '2.0', 'id': 1,
+                        'error': {'code': -32601, 'message': f"the method {method} does not exist"}}
+            try:
+                return {'jsonrpc': '2.0', 'id': 1, 'result': handler(*params)}
+            except ValueError as e:
+                return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': str(e)}}
+
+    def _rpc_eth_chainId(self):
+        return _hex(self.chain_id)
+
+    def _rpc_net_version(self):
+        return str(self.chain_id)
+
+    def _rpc_web3_clientVersion(self):
+        return "LocalChain/v0.1"
+
+    def _rpc_eth_gasPrice(self):
+        return _hex(self.gas_price)
+
+    def _rpc_eth_blockNumber(self):
+        return _hex(self.block_number)
+
+    def _rpc_eth_getTransactionCount(self, address, block_identifier='latest'):
+        sender = to_checksum_address(address)
+        nonce = self.mined_nonces.get(sender, 0)
+        if block_identifier == 'pending':
+            pool = self.pending.get(sender, {})
+            while nonce in pool:
+                nonce += 1
+        return _hex(nonce)
+
+    def _rpc_eth_sendRawTransaction(self, raw_hex):
+        raw = bytes.fromhex(raw_hex[2:] if raw_hex.startswith('0x') else raw_hex)
+        if raw[0] <= 0x7f:
+            raise ValueError("only legacy transactions are supported")
+        fields = rlp.decode(raw)
+        nonce = int.from_bytes(fields[0], 'big')
+        gas_price = int.from_bytes(fields[1], 'big')
+        tx_hash = '0x' + keccak(raw).hex()
+        sender = to_checksum_address(Account.recover_transaction(raw))
+
+        if tx_hash in self.receipts:
+            raise ValueError("already known")
+        if nonce < self.mined_nonces.get(sender, 0):
+            raise ValueError("nonce too low")
+
+        pool = self.pending.setdefault(sender, {})
+        existing = pool.get(nonce)
+        if existing:
+            if existing['hash'] == tx_hash:
+                raise ValueError("already known")
+            if gas_price < existing['gasPrice'] * REPLACEMENT_BUMP:
+                raise ValueError("replacement transaction underpriced")
+
+        pool[nonce] = {
+            'hash': tx_hash,
+            'from': sender,
+            'to': to_checksum_address(fields[3]) if fields[3] else None,
+            'nonce': nonce,
+            'gasPrice': gas_price,
+            # Replacements are never stalled, so a stuck nonce can always be unstuck
+            'stalled': existing is None and self.random.random() < self.stall_rate
+        }
+        return tx_hash
+
+    def _rpc_eth_getTransactionReceipt(self, tx_hash):
+        return self.receipts.get(tx_hash)
+
+    # --- Mining ---
+
+    def _mine_due_blocks(self):
+        now = time.monotonic()
+        while now >= self.next_block_at:
+            self._mine_block()
+            self.next_block_at += self.block_time
+
+    def _mine_block(self):
+        self.block_number += 1
+        block_hash = '0x' + keccak(f"block:{self.block_number}".encode()).hex()
+        index = 0
+        for sender, pool in self.pending.items():
+            nonce = self.mined_nonces.get(sender, 0)
+            while nonce in pool and not pool[nonce]['stalled']:
+                tx = pool.pop(nonce)
+                self.receipts[tx['hash']] = {
+                    'transactionHash': tx['hash'],
+                    'transactionIndex': _hex(index),
+                    'blockHash': block_hash,
+                    'blockNumber': _hex(self.block_number),
+                    'from': tx['from'],
+                    'to': tx['to'],
+                    'cumulativeGasUsed': _hex(50_000 * (index + 1)),
+                    'gasUsed': _hex(50_000),
+                    'effectiveGasPrice': _hex(tx['gasPrice']),
+                    'contractAddress': None,
+                    'logs': [],
+                    'logsBloom': '0x' + '00' * 256,
+                    'status': '0x1',
+                    'type': '0x0'
+                }
+                index += 1
+                nonce += 1
+            self.mined_nonces[sender] = nonce
+
+def local_web3(**kwargs) -> Web3:
+    """A Web3 instance backed by a fresh LocalChainProvider."""
+    return Web3(LocalChainProvider(**kwargs))
@@ -1,7 +1,7 @@
 # node/app.py
 import os
 import sys
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
@@ -9,12 +9,96 @@ from src.api.wallet import wallet_bp, crypto_bp
 from src.api.transaction import tx_bp
 from src.api.gossip import gossip_bp
 from src.api.blockchain import blockchain_bp, debug_bp
+from src.core.node import Node
+from src.core.admission import AdmissionController
+from src.core.writer import RemoteAdmissionController, RemoteNode, WriterClient, WriterUnavailable
+from src.p2p.gossip import PEERS
+from src.telemetry import metrics, tracing
 
-def create_app():
-    """Application factory function"""
+def load_config(overrides=None) -> dict:
+    """
+    Reads the node's settings from the environment.
+    `overrides` replaces individual settings, e.g. to run several nodes in
+    one process with their own NODE_ID, DATA_DIR, PEERS and TRANSPORT.
+    """
+    config = {
+        'NODE_ID': os.environ.get('NODE_ID', 'node-unknown'),
+        'DATA_DIR': os.environ.get('DATA_DIR', 'data'),
+        'PEERS': PEERS,
+        'TRANSPORT': None, # None means the default HTTP transport
+        'METRICS_ENABLED': os.environ.get('METRICS_ENABLED', '1') != '0',
+        'TRACE_SAMPLE_RATE': float(os.environ.get('TRACE_SAMPLE_RATE', 0.0)),
+        # Admission control (see src/core/admission.py); a rate of 0 disables that limit
+        'SENDER_RATE': float(os.environ.get('SENDER_RATE', 20)),
+        'SENDER_BURST': float(os.environ.get('SENDER_BURST', 40)),
+        'SOURCE_RATE': float(os.environ.get('SOURCE_RATE', 500)),
+        'SOURCE_BURST': float(os.environ.get('SOURCE_BURST', 1000)),
+        'MAX_TX_BYTES': int(os.environ.get('MAX_TX_BYTES', 4096)),
+        # Largest gossiped block body; a full mempool forges a block of several MB
+        'MAX_BLOCK_BYTES': int(os.environ.get('MAX_BLOCK_BYTES', 16 * 1024 * 1024)),
+        # Per process; serve.py caps both to fit each worker's request threads
+        'VERIFY_CONCURRENCY': int(os.environ.get('VERIFY_CONCURRENCY', 4)),
+        'VERIFY_QUEUE_SIZE': int(os.environ.get('VERIFY_QUEUE_SIZE', 256)),
+        'MEMPOOL_MAX_SIZE': int(os.environ.get('MEMPOOL_MAX_SIZE', 10000)),
+        # Set by serve.py in front-end workers: where the single writer listens
+        'WRITER_ADDRESS': None,
+        'WRITER_AUTHKEY': None
+    }
+    if overrides:
+        config.update(overrides)
+    return config
+
+def admission_options(config) -> dict:
+    """AdmissionController arguments from the node's settings."""
+    return {
+        'sender_rate': config['SENDER_RATE'],
+        'sender_burst': config['SENDER_BURST'],
+        'source_rate': config['SOURCE_RATE'],
+        'source_burst': config['SOURCE_BURST'],
+        'max_tx_bytes': config['MAX_TX_BYTES'],
+        'max_concurrent_verifications': config['VERIFY_CONCURRENCY'],
+        'max_queued_verifications': config['VERIFY_QUEUE_SIZE']
+    }
+
+def create_app(config=None):
+    """
+    Application factory function.
+    `config` overrides the environment (see load_config).
+    """
     app = Flask(__name__)
+    app.config.update(load_config(config))
+    # Flask refuses anything bigger outright (413); /tx and /gossip/tx then
+    # hold transactions to MAX_TX_BYTES themselves.
+    app.config['MAX_CONTENT_LENGTH'] = max(app.config['MAX_TX_BYTES'], app.config['MAX_BLOCK_BYTES'])
+
+    # Metrics are process-wide, so the last app created decides
+    metrics.set_enabled(app.config['METRICS_ENABLED'])
+    tracing.set_sample_rate(app.config['TRACE_SAMPLE_RATE'])
 
-    app.config['NODE_ID'] = os.environ.get('NODE_ID', 'node-unknown')
+    if app.config['WRITER_ADDRESS']:
+        # Front-end worker: state and rate limits live in the writer process
+        writer = WriterClient(app.config['WRITER_ADDRESS'], app.config['WRITER_AUTHKEY'])
+        app.extensions['node'] = RemoteNode(
+            writer,
+            node_id=app.config['NODE_ID'],
+            data_dir=app.config['DATA_DIR'],
+            peers=app.config['PEERS'],
+            transport=app.config['TRANSPORT'],
+            admission=RemoteAdmissionController(writer, **admission_options(app.config))
+        )
+    else:
+        app.extensions['node'] = Node(
+            node_id=app.config['NODE_ID'],
+            data_dir=app.config['DATA_DIR'],
+            peers=app.config['PEERS'],
+            transport=app.config['TRANSPORT'],
+            admission=AdmissionController(**admission_options(app.config)),
+            mempool_max_size=app.config['MEMPOOL_MAX_SIZE']
+        )
+
+    @app.errorhandler(WriterUnavailable)
+    def writer_unavailable(e):
+        return jsonify({'error': str(e)}), 503
     
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -23,6 +107,12 @@ def create_app():
             'nodeId': app.config['NODE_ID']
         }), 200
 
+    @app.route('/metrics', methods=['GET'])
+    def metrics_endpoint():
+        """Prometheus scrape endpoint."""
+        snapshot = app.extensions['node'].metrics_snapshot()
+        return Response(metrics.REGISTRY.render(snapshot), mimetype='text/plain; version=0.0.4')
+
     # Register our blueprints
     app.register_blueprint(wallet_bp, url_prefix='/wallet')
     app.register_blueprint(crypto_bp, url_prefix='/crypto')
@@ -0,0 +1,288 @@
+# node/bench/microbench.py
+"""
+Microbenchmarks for the node's hot paths, with baseline regression checks.
+
+Covers Transaction.compute_hash/verify, build_merkle_root, Block.to_dict/
+from_dict, Database.save_block/get_block_by_height on a temporary LevelDB,
+Mempool.add_transaction under thread contention and the Flask endpoints
+through the test client, each at several input sizes.
+
+Run from the node/ directory:
+    python -m bench.microbench --out results.json
+    python -m bench.microbench --save-baseline bench/baseline.json
+    python -m bench.microbench --baseline bench/baseline.json --threshold 0.15
+
+With --baseline the exit code is 1 if any benchmark's median got slower
+than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from src.core.block import Block
+from src.core.mempool import Mempool
+from src.core.merkle import build_merkle_root
+from src.core.transaction import Transaction
+from src.crypto.wallet import Wallet, hash_data
+from src.db.database import Database
+from src.telemetry import log
+
+DEFAULT_SIZES = [1, 10, 100, 1000]
+
+# --- Fixtures ---
+
+_wallet = Wallet(private_key_bytes=hash_data("microbench:wallet"))
+_signed_cache: List[Transaction] = []
+
+def signed_transactions(count: int) -> List[Transaction]:
+    """Returns `count` signed transactions; signing is slow so they are cached across benchmarks."""
+    while len(_signed_cache) < count:
+        nonce = len(_signed_cache)
+        tx = Transaction(sender=_wallet.public_key, to="microbench", amount=nonce, nonce=nonce,
+                         data=json.dumps({'temp': 4.5, 'seq': nonce}), timestamp=1700000000 + nonce)
+        tx.sign(_wallet)
+        _signed_cache.append(tx)
+    return _signed_cache[:count]
+
+def make_block(tx_count: int, index: int = 1) -> Block:
+    return Block(index=index, prev_hash="0" * 64, proposer_id="microbench",
+                 transactions=signed_transactions(tx_count), timestamp=1700000000)
+
+# --- Timing ---
+
+def measure(op: Callable[[], None], items_per_op: int, min_time: float, rounds: int) -> Dict:
+    """
+    Times `op` over several rounds. The number of calls per round is
+    calibrated so a round takes about `min_time` seconds.
+    Reports per-item timings in microseconds.
+    """
+    op() # warm-up
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            op()
+        if time.perf_counter() - t0 >= min_time / 10 or number >= 1 << 20:
+            break
+        number *= 2
+    per_round = max(1, int(number * min_time / max(time.perf_counter() - t0, 1e-9)))
+
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(per_round):
+            op()
+        samples.append((time.perf_counter() - t0) / (per_round * items_per_op))
+
+    median = statistics.median(samples)
+    return {
+        'medianUs': round(median * 1e6, 3),
+        'minUs': round(min(samples) * 1e6, 3),
+        'maxUs': round(max(samples) * 1e6, 3),
+        'opsPerSec': round(1 / median, 1) if median > 0 else None,
+        'rounds': rounds,
+        'callsPerRound': per_round
+    }
+
+# --- Benchmarks ---
+# Each benchmark takes an input size and returns (op, items_per_op, cleanup).
+
+def bench_tx_compute_hash(size):
+    txs = signed_transactions(size)
+    return (lambda: [tx.compute_hash() for tx in txs]), size, None
+
+def bench_tx_verify(size):
+    txs = signed_transactions(size)
+    return (lambda: [tx.verify() for tx in txs]), size, None
+
+def bench_merkle_root(size):
+    hashes = [tx.hash for tx in signed_transactions(size)]
+    return (lambda: build_merkle_root(hashes)), 1, None
+
+def bench_block_to_dict(size):
+    block = make_block(size)
+    return block.to_dict, 1, None
+
+def bench_block_from_dict(size):
+    data = make_block(size).to_dict()
+    return (lambda: Block.from_dict(data)), 1, None
+
+def bench_db_save_block(size):
+    tmp = tempfile.mkdtemp(prefix='coldchain-bench-')
+    db = Database("bench", data_dir=tmp)
+    block = make_block(size)
+
+    def cleanup():
+        db.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return (lambda: db.save_block(block)), 1, cleanup
+
+def bench_db_get_block_by_height(size):
+    tmp = tempfile.mkdtemp(prefix='coldchain-bench-')
+    db = Database("bench", data_dir=tmp)
+    for height in range(8):
+        db.save_block(make_block(size, index=height))
+
+    def cleanup():
+        db.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return (lambda: db.get_block_by_height(5)), 1, cleanup
+
+def bench_mempool_add_contended(size, threads: int = 4):
+    """`size` transactions added to a fresh mempool by `threads` threads at once."""
+    txs = signed_transactions(size)
+    chunks = [txs[i::threads] for i in range(threads)]
+
+    def op():
+        mempool = Mempool()
+        workers = [threading.Thread(target=lambda c=chunk: [mempool.add_transaction(tx) for tx in c])
+                   for chunk in chunks]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    return op, size, None
+
+def _bench_app():
+    tmp = tempfile.mkdtemp(prefix='coldchain-bench-')
+    # One wallet signs everything, so rate limits stay off
+    app = create_app({'NODE_ID': 'bench', 'DATA_DIR': tmp, 'PEERS': [], 'SENDER_RATE': 0, 'SOURCE_RATE': 0})
+
+    def cleanup():
+        app.extensions['node'].close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return app, cleanup
+
+def bench_api_post_tx(size):
+    """POST /tx/ for `size` transactions, clearing the mempool between rounds."""
+    app, cleanup = _bench_app()
+    client = app.test_client()
+    payloads = [tx.to_dict() for tx in signed_transactions(size)]
+    mempool = app.extensions['node'].mempool
+
+    def op():
+        mempool.clear()
+        for payload in payloads:
+            status = client.post('/tx/', json=payload).status_code
+            if status != 202:
+                raise RuntimeError(f"POST /tx/ returned {status}; the benchmark would time the rejection path")
+    return op, size, cleanup
+
+def bench_api_get_mempool(size):
+    app, cleanup = _bench_app()
+    client = app.test_client()
+    for tx in signed_transactions(size):
+        app.extensions['node'].mempool.add_transaction(tx)
+    return (lambda: client.get('/tx/mempool')), 1, cleanup
+
+def bench_api_get_block(size):
+    app, cleanup = _bench_app()
+    client = app.test_client()
+    app.extensions['node'].blockchain.add_block(
+        Block(index=1, prev_hash=app.extensions['node'].blockchain.get_head().hash,
+              proposer_id="microbench", transactions=signed_transactions(size)))
+    return (lambda: client.get('/chain/block/height/1')), 1, cleanup
+
+BENCHMARKS = {
+    'tx.compute_hash': bench_tx_compute_hash,
+    'tx.verify': bench_tx_verify,
+    'merkle.build_root': bench_merkle_root,
+    'block.to_dict': bench_block_to_dict,
+    'block.from_dict': bench_block_from_dict,
+    'db.save_block': bench_db_save_block,
+    'db.get_block_by_height': bench_db_get_block_by_height,
+    'mempool.add_contended': bench_mempool_add_contended,
+    'api.post_tx': bench_api_post_tx,
+    'api.get_mempool': bench_api_get_mempool,
+    'api.get_block': bench_api_get_block,
+}
+
+# --- Running and comparing ---
+
+def run(names: List[str], sizes: List[int], min_time: float, rounds: int) -> Dict:
+    results = {}
+    for name in names:
+        for size in sizes:
+            op, items, cleanup = BENCHMARKS[name](size)
+            try:
+                key = f"{name}[{size}]"
+                results[key] = measure(op, items, min_time, rounds)
+                print(f"{key:<36} {results[key]['medianUs']:>12.3f} us/item")
+            finally:
+                if cleanup:
+                    cleanup()
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': int(time.time())
+        },
+        'results': results
+    }
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Returns a line per benchmark whose median is slower than baseline by more than `threshold`."""
+    regressions = []
+    for key, result in current['results'].items():
+        base = baseline['results'].get(key)
+        if not base or not base['medianUs']:
+            continue
+        change = result['medianUs'] / base['medianUs'] - 1
+        if change > threshold:
+            regressions.append(f"{key}: {base['medianUs']} us -> {result['medianUs']} us (+{change:.1%})")
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Node hot-path microbenchmarks.")
+    parser.add_argument('--only', help="Comma-separated benchmark names (default: all).")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--min-time', type=float, default=0.2, help="Target seconds per round.")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--out', help="Write results as JSON to this path.")
+    parser.add_argument('--save-baseline', help="Write results as the new baseline to this path.")
+    parser.add_argument('--baseline', help="Compare against this baseline JSON.")
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('BENCH_THRESHOLD', 0.10)),
+                        help="Allowed slowdown vs. baseline as a fraction (default 0.10).")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [int(size) for size in args.sizes.split(',')]
+    if 'LOG_LEVEL' not in os.environ:
+        # Info records (one block_saved per save, ...) would be timed along
+        # with the work and written out while it is measured
+        log.get_log().level = log.WARNING
+
+    current = run(names, sizes, args.min_time, args.rounds)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(current, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\n✅ No regressions above {args.threshold:.0%}.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
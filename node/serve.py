@@ -0,0 +1,176 @@
+# node/serve.py
+"""
+Production serving mode: one writer process plus N front-end workers.
+
+    python serve.py --workers 4 --threads 8 --port 8000
+
+The writer owns the mempool, blockchain and LevelDB (see src/core/writer.py).
+The workers are gunicorn `gthread` workers sharing the listening socket.
+Workers parse requests, check sizes and formats, and verify signatures on
+their own core. They forward verified transactions and block operations to
+the writer over a Unix socket. Rate limits are kept by the writer, so
+SENDER_RATE and SOURCE_RATE hold for the node as a whole.
+
+A worker runs at most --threads requests at once, so VERIFY_CONCURRENCY
+and VERIFY_QUEUE_SIZE apply per worker and are capped to fit its threads
+(see verification_limits). One thread is always left to turn requests
+away with 429 "overloaded" instead of letting them wait in gunicorn's
+connection queue.
+
+Configuration comes from the same environment variables as app.py. /metrics
+reports the whole node: every worker's series added to the writer's
+(LevelDB, block commit, Merkle timings), see src/core/writer.py. No
+per-request access log is written.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import traceback
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from gunicorn.app.base import BaseApplication
+
+from app import admission_options, create_app, load_config
+from src.core.admission import AdmissionController
+from src.core.node import Node
+from src.core.writer import run_writer
+from src.telemetry import log
+
+WRITER_START_TIMEOUT = 30
+
+def writer_main(address: str, authkey: bytes, ready):
+    # Ctrl-C goes to the whole process group; let the parent stop us in order.
+    # SIGTERM unwinds through run_writer so the database is closed cleanly.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    config = load_config()
+    node = Node(
+        node_id=config['NODE_ID'],
+        data_dir=config['DATA_DIR'],
+        admission=AdmissionController(**admission_options(config)),
+        mempool_max_size=config['MEMPOOL_MAX_SIZE']
+    )
+    run_writer(node, address, authkey, ready)
+
+def _fork_writer(address: str, authkey: bytes, ready) -> int:
+    """
+    Starts the writer with a plain fork() rather than multiprocessing.Process:
+    gunicorn forks the workers from this process later, and multiprocessing
+    would have each of them try to join the writer at exit.
+    """
+    pid = os.fork()
+    if pid:
+        return pid
+    code = 1
+    try:
+        writer_main(address, authkey, ready)
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        # Never return into the caller's code
+        log.get_log().flush()
+        os._exit(code)
+
+def verification_limits(config: dict, threads: int) -> dict:
+    """
+    VERIFY_CONCURRENCY and VERIFY_QUEUE_SIZE for a worker with `threads`
+    request threads. Slots and queue together leave one thread free: with
+    every thread taken, nothing would be left to reach the full queue.
+    """
+    concurrency = max(1, min(config['VERIFY_CONCURRENCY'], threads - 1))
+    queue_size = max(0, min(config['VERIFY_QUEUE_SIZE'], threads - 1 - concurrency))
+    return {'VERIFY_CONCURRENCY': concurrency, 'VERIFY_QUEUE_SIZE': queue_size}
+
+class FrontEnd(BaseApplication):
+    """Gunicorn application whose workers each build an app bound to the writer."""
+    def __init__(self, options: dict, app_config: dict):
+        self.options = options
+        self.app_config = app_config
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Called in each worker after the fork
+        return create_app(self.app_config)
+
+def _stop_when_writer_exits(writer: int, stopping: threading.Event):
+    """Without the writer every request fails; take the whole server down."""
+    try:
+        os.waitpid(writer, 0)
+    except ChildProcessError:
+        return # reaped by serve() on the way out
+    if not stopping.is_set():
+        os.kill(os.getpid(), signal.SIGTERM)
+
+def _stop_writer(writer: int):
+    try:
+        os.kill(writer, signal.SIGTERM)
+        os.waitpid(writer, 0)
+    except (ProcessLookupError, ChildProcessError):
+        pass # already gone
+
+def serve(workers: int, threads: int, host: str, port: int):
+    config = load_config()
+    os.makedirs(config['DATA_DIR'], exist_ok=True)
+    address = os.path.join(config['DATA_DIR'], f"{config['NODE_ID']}_writer.sock")
+    if os.path.exists(address):
+        os.unlink(address) # left over from a previous run
+    authkey = os.urandom(32)
+
+    ready = multiprocessing.get_context('fork').Event()
+    writer = _fork_writer(address, authkey, ready)
+    if not ready.wait(WRITER_START_TIMEOUT):
+        _stop_writer(writer)
+        raise RuntimeError("Writer process did not start")
+    stopping = threading.Event()
+    threading.Thread(target=_stop_when_writer_exits, args=(writer, stopping), daemon=True).start()
+
+    app_config = {'WRITER_ADDRESS': address, 'WRITER_AUTHKEY': authkey, **verification_limits(config, threads)}
+    log.info('serve_verification_limits', threads=threads, concurrency=app_config['VERIFY_CONCURRENCY'],
+             queueSize=app_config['VERIFY_QUEUE_SIZE'])
+
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        'accesslog': None,
+        'errorlog': '-',
+        'proc_name': f"coldchain-{config['NODE_ID']}"
+    }
+    master = os.getpid()
+    try:
+        FrontEnd(options, app_config).run()
+    finally:
+        # Workers are forked inside run() and leave through sys.exit(), so
+        # they pass through here too; only the master owns the writer.
+        if os.getpid() == master:
+            # gunicorn has stopped its workers, so nothing is mid-call when
+            # the writer closes the database
+            stopping.set()
+            _stop_writer(writer)
+            if os.path.exists(address):
+                os.unlink(address)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a node with several front-end workers.")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WORKERS', os.cpu_count() or 1)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('THREADS', 8)),
+                        help="Request threads per worker.")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 8000)))
+    args = parser.parse_args(argv)
+    serve(args.workers, args.threads, args.host, args.port)
+
+if __name__ == '__main__':
+    main()
@@ -1,22 +1,16 @@
 # node/src/api/blockchain.py
-from flask import Blueprint, jsonify, current_app
+from flask import Blueprint, Response, jsonify, request
 from ..core.blockchain import Blockchain
-from ..core.block import Block
-from .transaction import mempool # Import our global mempool
+from ..p2p.gossip import broadcast_block
+from ..telemetry import profiler, tracing
+from .context import get_node
 
 blockchain_bp = Blueprint('blockchain', __name__)
 debug_bp = Blueprint('debug', __name__)
 
-# This is a shortcut. The blockchain instance is created when the first request comes in.
-# A better approach uses the Flask application factory pattern more robustly.
-blockchain_instance = None
-
-def get_blockchain():
-    global blockchain_instance
-    if blockchain_instance is None:
-        node_id = current_app.config['NODE_ID']
-        blockchain_instance = Blockchain(node_id=node_id)
-    return blockchain_instance
+def get_blockchain() -> Blockchain:
+    # The node opens its blockchain when the first request needs it.
+    return get_node().blockchain
 
 @blockchain_bp.route('/block/height/<int:height>', methods=['GET'])
 def get_block_by_height(height):
@@ -41,24 +35,59 @@ def mine_block():
     A temporary endpoint to manually create a block from mempool transactions.
     In a real consensus mechanism (Phase 5), this would be automated.
     """
-    blockchain = get_blockchain()
-    node_id = current_app.config['NODE_ID']
-    
-    last_block = blockchain.get_head()
-    txs_to_include = mempool.get_transactions()
-    
-    new_block = Block(
-        index=last_block.header['index'] + 1,
-        prev_hash=last_block.hash,
-        proposer_id=node_id,
-        transactions=txs_to_include
-    )
+    node = get_node()
+    new_block = node.forge_block()
     
-    blockchain.add_block(new_block)
+    broadcast_block(new_block, node.peers, node.transport)
     
-    # Clear the mempool after including transactions in a block
-    mempool.clear()
-    
-    # TODO: In Phase 5, we will broadcast this new block to peers.
-    
-    return jsonify({'message': 'New block forged', 'block': new_block.to_dict()}), 201
\ No newline at end of file
+    return jsonify({'message': 'New block forged', 'block': new_block.to_dict()}), 201
+
+# Profiling a live node for longer than this is almost certainly a mistake
+MAX_PROFILE_SECONDS = 120
+
+@debug_bp.route('/profile', methods=['GET'])
+def profile():
+    """
+    Samples the stacks of all threads (including gossip workers) for
+    `seconds` and returns them in collapsed-stack format, ready for
+    flamegraph.pl or speedscope.
+    """
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        hz = int(request.args.get('hz', 100))
+    except ValueError:
+        return jsonify({'error': 'seconds and hz must be numbers'}), 400
+    if not 0 < seconds <= MAX_PROFILE_SECONDS or not 1 <= hz <= 1000:
+        return jsonify({'error': f'seconds must be in (0, {MAX_PROFILE_SECONDS}] and hz in [1, 1000]'}), 400
+
+    try:
+        stacks = profiler.sample(seconds, hz)
+    except profiler.ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+
+    return Response(profiler.to_collapsed(stacks), mimetype='text/plain',
+                    headers={'Content-Disposition': 'attachment; filename=profile.folded'})
+
+# More than the ring buffer ever holds
+MAX_TRACES = 10000
+
+@debug_bp.route('/traces', methods=['GET'])
+def get_traces():
+    """Returns the most recent sampled request traces, newest first."""
+    limit = min(max(request.args.get('limit', 50, type=int), 0), MAX_TRACES)
+    return jsonify({
+        'sampleRate': tracing.get_sample_rate(),
+        'traces': tracing.recent_traces(limit)
+    })
+
+@debug_bp.route('/traces/sample-rate', methods=['PUT'])
+def set_trace_sample_rate():
+    """Switches tracing on for a fraction of /tx and /gossip/tx calls (0 turns it off)."""
+    data = request.get_json()
+    if not data or 'sampleRate' not in data:
+        return jsonify({'error': 'sampleRate is required'}), 400
+    try:
+        tracing.set_sample_rate(data['sampleRate'])
+    except (TypeError, ValueError):
+        return jsonify({'error': 'sampleRate must be a finite number'}), 400
+    return jsonify({'sampleRate': tracing.get_sample_rate()})
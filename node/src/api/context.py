@@ -0,0 +1,7 @@
+# node/src/api/context.py
+from flask import current_app
+from src.core.node import Node
+
+def get_node() -> Node:
+    """Returns the Node owned by the app handling the current request."""
+    return current_app.extensions['node']
@@ -1,46 +1,77 @@
 # node/src/api/gossip.py
+from typing import Optional
 from flask import Blueprint, jsonify, request
-from src.core.transaction import Transaction
+from src.core.block import Block
+from src.core.node import BLOCK_KNOWN, BLOCK_REJECTED
 
-from .transaction import mempool
+from src.telemetry import log, tracing
+from .context import get_node
+from .transaction import admit_transaction, rejection_response
 
 gossip_bp = Blueprint('gossip', __name__)
 
 @gossip_bp.route('/tx', methods=['POST'])
+@tracing.traced('POST /gossip/tx')
 def receive_gossiped_tx():
     """
     An endpoint specifically for receiving transactions from other peers.
     It validates and adds the transaction to the mempool but does NOT
     broadcast it again. This prevents network storms.
     """
-    data = request.get_json()
-    required_fields = ['from', 'to', 'amount', 'nonce', 'signature']
-    if not data or not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required transaction fields'}), 400
+    tx, rejection = admit_transaction()
+
+    if rejection is None:
+        log.debug('gossip_tx_accepted', tx=tx.hash, peer=request.remote_addr)
+        return jsonify({'message': 'Transaction accepted'}), 202
+    if rejection.reason == "duplicate":
+        # It's common to receive a duplicate, which is not an error.
+        return jsonify({'message': rejection.message}), 208 # 208 Already Reported
+    log.info('gossip_tx_rejected', reason=rejection.reason, status=rejection.status,
+             message=rejection.message, peer=request.remote_addr)
+    return rejection_response(rejection, {'error': rejection.message})
+
+def _check_block(block: Block) -> Optional[str]:
+    """
+    Checks that a peer's block is internally consistent: its hash covers its
+    header (and so the Merkle root of its transaction hashes), each
+    transaction hash matches the transaction, and every signature verifies.
+    Returns the problem, or None.
+    """
+    if block.hash != block.compute_hash():
+        return "block hash does not match its header"
+    for tx in block.transactions:
+        if tx.hash != tx.compute_hash():
+            return f"transaction hash {tx.hash} does not match its contents"
+        if not tx.verify():
+            return f"transaction {tx.hash} has an invalid signature"
+    return None
+
+@gossip_bp.route('/block', methods=['POST'])
+def receive_gossiped_block():
+    """
+    Receives a block forged by a peer. If it extends our head it is saved and
+    its transactions are dropped from the mempool. Like transactions, blocks
+    are not re-broadcast.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not all(field in data for field in ('hash', 'header', 'transactions')):
+        return jsonify({'error': 'Missing required block fields'}), 400
 
     try:
-        tx = Transaction(
-            sender=data['from'],
-            to=data['to'],
-            amount=int(data['amount']),
-            nonce=int(data['nonce']),
-            data=data.get('data', ""),
-            timestamp=int(data['timestamp']),
-            signature=data['signature']
-        )
-        tx.hash = tx.compute_hash()
-
-        # We use the same mempool to add the transaction
-        success, message = mempool.add_transaction(tx)
-        
-        if success:
-            print(f" Gossiped tx {tx.hash[:10]}... accepted.")
-            return jsonify({'message': 'Transaction accepted'}), 202
-        else:
-            # It's common to receive a duplicate, which is not an error.
-            # The mempool handles this gracefully.
-            print(f" Gossiped tx rejected: {message}")
-            return jsonify({'message': message}), 208 # 208 Already Reported
-    except Exception as e:
-        print(f"Error processing gossiped tx: {e}")
-        return jsonify({'error': 'Invalid transaction data'}), 400
\ No newline at end of file
+        block = Block.from_dict(data)
+        error = _check_block(block)
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        error = str(e)
+    if error:
+        log.warning('gossip_block_invalid', error=error, peer=request.remote_addr)
+        return jsonify({'error': f'Invalid block data: {error}'}), 400
+
+    status = get_node().import_block(block)
+    if status == BLOCK_KNOWN:
+        return jsonify({'message': 'Block already known'}), 208
+    if status == BLOCK_REJECTED:
+        return jsonify({'error': 'Block does not extend the current head'}), 409
+
+    log.info('gossip_block_accepted', index=block.header['index'], block=block.hash,
+             peer=request.remote_addr)
+    return jsonify({'message': 'Block accepted'}), 202
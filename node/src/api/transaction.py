@@ -1,56 +1,133 @@
 # node/src/api/transaction.py
+import json
+from typing import Optional, Tuple
 from flask import Blueprint, jsonify, request
 from src.core.transaction import Transaction
-from src.core.mempool import Mempool
+from src.core.admission import Rejection, retry_after_header, record as record_rejection
 from src.p2p.gossip import broadcast_transaction
-
-# Let's create a single, global mempool instance for our node
-# In a more advanced app, this would be managed by a central Node class.
-mempool = Mempool()
+from src.telemetry import log, metrics, tracing
+from .context import get_node
 
 tx_bp = Blueprint('transaction', __name__)
 
+def admit_transaction() -> Tuple[Optional[Transaction], Optional[Rejection]]:
+    """
+    Runs the submitted transaction through admission control and into the
+    mempool. All cheap checks (size, format, duplicates, rate limits) happen
+    before the signature is verified. Returns (tx, None) when the
+    transaction was added, otherwise (tx or None, rejection).
+    Senders are limited by public key and callers (clients or peers) by
+    address.
+    """
+    node = get_node()
+    admission = node.admission
+
+    with tracing.span('parse'):
+        # Size first, so an oversized body is never read in full or parsed
+        rejection = admission.check_size(request.content_length)
+        if rejection is None:
+            # Chunked requests have no Content-Length, so never read more
+            # than one byte past the limit.
+            body = request.stream.read(admission.max_tx_bytes + 1)
+            rejection = admission.check_size(len(body))
+        if rejection is None:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                data = None
+            required_fields = ['from', 'to', 'amount', 'nonce', 'signature', 'timestamp']
+            if not isinstance(data, dict) or not all(field in data for field in required_fields):
+                rejection = Rejection(400, "missing_fields", 'Missing required transaction fields')
+            else:
+                rejection = admission.check_format(data)
+        if rejection:
+            record_rejection(rejection)
+            return None, rejection
+
+        # Reconstruct the Transaction object from the request data
+        tx = Transaction(
+            sender=data['from'],
+            to=data['to'],
+            amount=int(data['amount']),
+            nonce=int(data['nonce']),
+            data=data.get('data', ""),
+            timestamp=int(data['timestamp']),
+            signature=data['signature']
+        )
+
+    # Before adding, compute its hash to ensure consistency
+    with tracing.span('hash'):
+        tx.hash = tx.compute_hash()
+
+    # Duplicates and a full pool are rejected by the mempool before it verifies,
+    # but checking here keeps them out of the verification queue. Duplicates
+    # are checked before the rate limits since every peer gossips each tx to us.
+    if node.mempool.get_transaction_by_hash(tx.hash):
+        metrics.TX_REJECTED.labels("duplicate").inc()
+        return tx, Rejection(400, "duplicate", "Duplicate transaction")
+    if node.mempool.is_full():
+        metrics.TX_REJECTED.labels("mempool_full").inc()
+        return tx, Rejection(429, "mempool_full", "Mempool full", admission.overload_retry_after)
+
+    rejection = admission.check_rate(tx.sender, request.remote_addr)
+    if rejection is None:
+        rejection = admission.acquire_verification()
+        if rejection:
+            # Shed without doing any work: a retry must not find its budget gone
+            admission.refund_rate(tx.sender, request.remote_addr)
+    if rejection:
+        record_rejection(rejection)
+        return tx, rejection
+    try:
+        success, message = node.mempool.add_transaction(tx)
+    finally:
+        admission.release_verification()
+
+    if success:
+        return tx, None
+    if message == "Mempool full":
+        return tx, Rejection(429, "mempool_full", message, admission.overload_retry_after)
+    if message == "Duplicate transaction":
+        return tx, Rejection(400, "duplicate", message)
+    # `from` is unauthenticated: a forged transaction must not use up the
+    # real sender's budget. The caller's address has still been charged.
+    admission.refund_rate(tx.sender)
+    return tx, Rejection(400, "invalid_signature", message)
+
+def rejection_response(rejection: Rejection, body: dict):
+    return jsonify(body), rejection.status, retry_after_header(rejection)
+
 @tx_bp.route('/', methods=['POST'])
+@tracing.traced('POST /tx')
 def create_transaction():
     """
     Receives a new transaction, validates it, and adds it to the mempool.
     The transaction is expected to be already signed.
     """
-    data = request.get_json()
-    required_fields = ['from', 'to', 'amount', 'nonce', 'signature']
-    if not data or not all(field in data for field in required_fields):
-        return jsonify({'error': 'Missing required transaction fields'}), 400
-
-    # Reconstruct the Transaction object from the request data
-    tx = Transaction(
-        sender=data['from'],
-        to=data['to'],
-        amount=int(data['amount']),
-        nonce=int(data['nonce']),
-        data=data.get('data', ""),
-        timestamp=int(data['timestamp']),
-        signature=data['signature']
-    )
-    
-    # Before adding, compute its hash to ensure consistency
-    tx.hash = tx.compute_hash()
+    tx, rejection = admit_transaction()
 
-    # Add to our node's mempool
-    success, message = mempool.add_transaction(tx)
-    
-    if success:
-        # TODO: In Phase 3, we will broadcast this transaction to peers.
-        return jsonify({'message': message, 'txHash': tx.hash}), 202 # 202 Accepted
+    if rejection is None:
+        node = get_node()
+        broadcast_transaction(tx, node.peers, node.transport)
+        return jsonify({'message': 'Transaction added', 'txHash': tx.hash}), 202 # 202 Accepted
     else:
-        print(f"❌ Transaction rejected: {message}")
-        return jsonify({'error': message}), 400 # 400 Bad Request
+        log.info('tx_rejected', reason=rejection.reason, status=rejection.status,
+                 message=rejection.message)
+        return rejection_response(rejection, {'error': rejection.message})
+
+@tx_bp.route('/admission', methods=['GET'])
+def get_admission_stats():
+    """
+    Returns the admission controller's queue depth and limits.
+    """
+    return jsonify(get_node().admission.stats())
 
 @tx_bp.route('/mempool', methods=['GET'])
 def get_mempool():
     """
     Returns the list of all transactions currently in the mempool.
     """
-    transactions_in_pool = [tx.to_dict() for tx in mempool.get_transactions()]
+    transactions_in_pool = [tx.to_dict() for tx in get_node().mempool.get_transactions()]
     return jsonify({
         'transactions': transactions_in_pool,
         'count': len(transactions_in_pool)
@@ -0,0 +1,211 @@
+# node/src/core/admission.py
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from src.telemetry import metrics
+
+HEX_RE = re.compile(r'^[0-9a-fA-F]*$')
+PUBLIC_KEY_HEX_LEN = 130 # uncompressed secp256k1: 04 || X || Y
+SIGNATURE_HEX_LEN = 128  # r || s
+MAX_TO_LEN = 128
+
+class Rejection(NamedTuple):
+    """Why a transaction was turned away before (or instead of) signature verification."""
+    status: int
+    reason: str   # metrics label
+    message: str
+    retry_after: Optional[float] = None
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`."""
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Takes one token. Returns 0 on success, else the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class RateLimiter:
+    """
+    One token bucket per key (sender public key, source address, ...).
+    Only the `max_keys` most recently seen keys are tracked, so a flood of
+    fresh keys cannot grow memory without bound.
+    """
+    def __init__(self, rate: float, burst: float, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, key: str) -> float:
+        """0 if `key` may proceed, else the seconds it should wait."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.rate, self.burst, now)
+                if len(self.buckets) > self.max_keys:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+            return bucket.take(now)
+
+    def refund(self, key: str):
+        """Gives back the token taken by the last check of `key`."""
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.tokens = min(self.burst, bucket.tokens + 1)
+
+class AdmissionController:
+    """
+    Sits in front of Mempool.add_transaction. Everything cheap (size, field
+    format, rate limits, duplicates) is checked before any ECDSA work, and
+    signature verification itself goes through a bounded queue: when it is
+    full the request is shed with 429 instead of piling up.
+    """
+    def __init__(self,
+                 sender_rate: float = 20.0,
+                 sender_burst: float = 40.0,
+                 source_rate: float = 500.0,
+                 source_burst: float = 1000.0,
+                 max_tx_bytes: int = 4096,
+                 max_data_bytes: int = 2048,
+                 max_concurrent_verifications: int = 4,
+                 max_queued_verifications: int = 256,
+                 overload_retry_after: float = 1.0):
+        self.senders = RateLimiter(sender_rate, sender_burst)
+        self.sources = RateLimiter(source_rate, source_burst)
+        self.max_tx_bytes = max_tx_bytes
+        self.max_data_bytes = max_data_bytes
+        self.max_queued_verifications = max_queued_verifications
+        self.overload_retry_after = overload_retry_after
+        self.verify_slots = threading.BoundedSemaphore(max_concurrent_verifications)
+        self.max_concurrent_verifications = max_concurrent_verifications
+        self.lock = threading.Lock()
+        self.waiting = 0   # requests queued for a verification slot
+        self.verifying = 0 # requests holding a slot
+
+    # --- Cheap checks ---
+
+    def check_size(self, content_length: Optional[int]) -> Optional[Rejection]:
+        if content_length is not None and content_length > self.max_tx_bytes:
+            return Rejection(413, "too_large", f"Transaction exceeds {self.max_tx_bytes} bytes")
+        return None
+
+    def check_format(self, data: dict) -> Optional[Rejection]:
+        """Validates field types and lengths so malformed input never reaches hashing or ECDSA."""
+        if not isinstance(data, dict):
+            return Rejection(400, "malformed", "Transaction must be a JSON object")
+        sender, signature, to = data.get('from'), data.get('signature'), data.get('to')
+        if not isinstance(sender, str) or len(sender) != PUBLIC_KEY_HEX_LEN or not HEX_RE.match(sender):
+            return Rejection(400, "malformed", "'from' must be an uncompressed hex public key")
+        if not isinstance(signature, str) or len(signature) != SIGNATURE_HEX_LEN or not HEX_RE.match(signature):
+            return Rejection(400, "malformed", "'signature' must be a 64-byte hex signature")
+        if not isinstance(to, str) or not 0 < len(to) <= MAX_TO_LEN:
+            return Rejection(400, "malformed", f"'to' must be a string of at most {MAX_TO_LEN} characters")
+        tx_data = data.get('data', "")
+        if not isinstance(tx_data, str) or len(tx_data.encode('utf-8')) > self.max_data_bytes:
+            return Rejection(400, "malformed", f"'data' must be a string of at most {self.max_data_bytes} bytes")
+        for field in ('amount', 'nonce', 'timestamp'):
+            value = data.get(field)
+            if isinstance(value, bool) or not isinstance(value, (int, str)):
+                return Rejection(400, "malformed", f"'{field}' must be a non-negative integer")
+            try:
+                if int(value) < 0:
+                    raise ValueError
+            except ValueError:
+                return Rejection(400, "malformed", f"'{field}' must be a non-negative integer")
+        return None
+
+    def check_rate(self, sender: str, source: Optional[str] = None) -> Optional[Rejection]:
+        """
+        Per-source limit first (the caller's address, client or peer), then
+        the per-sender limit. The sender's token is only kept if the
+        signature verifies and the request is not shed (see refund_rate).
+        """
+        if source is not None:
+            wait = self.sources.check(source)
+            if wait:
+                return Rejection(429, "source_rate_limited", "Source address rate limit exceeded", wait)
+        wait = self.senders.check(sender)
+        if wait:
+            return Rejection(429, "sender_rate_limited", "Sender rate limit exceeded", wait)
+        return None
+
+    def refund_rate(self, sender: str, source: Optional[str] = None):
+        """
+        Gives back the tokens check_rate took: the sender's when the
+        signature fails to verify, and the source's too when the request
+        was shed without being verified.
+        """
+        self.senders.refund(sender)
+        if source is not None:
+            self.sources.refund(source)
+
+    # --- Verification queue ---
+
+    def acquire_verification(self) -> Optional[Rejection]:
+        """
+        Reserves a verification slot, waiting in the queue if all are busy.
+        Returns a Rejection (and reserves nothing) if the queue is full.
+        """
+        if not self.verify_slots.acquire(blocking=False):
+            with self.lock:
+                if self.waiting >= self.max_queued_verifications:
+                    return Rejection(429, "overloaded", "Node is overloaded, retry later", self.overload_retry_after)
+                self.waiting += 1
+            self.verify_slots.acquire()
+            with self.lock:
+                self.waiting -= 1
+        with self.lock:
+            self.verifying += 1
+        return None
+
+    def release_verification(self):
+        with self.lock:
+            self.verifying -= 1
+        self.verify_slots.release()
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'queueDepth': self.waiting,
+                'verifying': self.verifying,
+                'maxQueuedVerifications': self.max_queued_verifications,
+                'maxConcurrentVerifications': self.max_concurrent_verifications,
+                **self.rate_stats()
+            }
+
+    def rate_stats(self) -> dict:
+        return {
+            'trackedSenders': len(self.senders.buckets),
+            'trackedSources': len(self.sources.buckets)
+        }
+
+def retry_after_header(rejection: Rejection) -> dict:
+    """The Retry-After header (whole seconds, at least 1) for a rejection, if it has one."""
+    if rejection.retry_after is None:
+        return {}
+    return {'Retry-After': str(max(1, math.ceil(rejection.retry_after)))}
+
+def record(rejection: Rejection):
+    metrics.TX_REJECTED.labels(rejection.reason).inc()
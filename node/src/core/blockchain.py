@@ -2,21 +2,27 @@
 from typing import Optional
 from src.core.block import Block
 from src.db.database import Database
+from src.telemetry import log, metrics
+
+# Fixed so that every node derives the same genesis hash and can accept
+# each other's blocks.
+GENESIS_TIMESTAMP = 1700000000
 
 class Blockchain:
-    def __init__(self, node_id: str):
-        self.db = Database(node_id)
+    def __init__(self, node_id: str, data_dir: str = "data"):
+        self.db = Database(node_id, data_dir)
         self._initialize_chain()
 
     def _initialize_chain(self):
         """Creates the genesis block if the chain is empty."""
         head_block = self.db.get_head_block()
         if not head_block:
-            print("No existing blockchain found. Creating genesis block...")
+            log.info('genesis_created')
             genesis_block = Block(
                 index=0,
                 prev_hash="0" * 64, # 64 zeros
-                proposer_id="genesis"
+                proposer_id="genesis",
+                timestamp=GENESIS_TIMESTAMP
             )
             self.db.save_block(genesis_block)
 
@@ -25,21 +31,28 @@ class Blockchain:
     
     def add_block(self, block: Block) -> bool:
         """Validates and adds a new block to the chain."""
+        start = metrics.start()
         head_block = self.get_head()
         if head_block:
             # Basic validation
             if block.header['index'] != head_block.header['index'] + 1:
-                print("Error: New block index is invalid.")
+                log.warning('block_rejected', reason='bad_index', index=block.header['index'],
+                            expected=head_block.header['index'] + 1)
                 return False
             if block.header['prevHash'] != head_block.hash:
-                print("Error: New block's prevHash does not match head.")
+                log.warning('block_rejected', reason='bad_prev_hash', index=block.header['index'],
+                            block=block.hash)
                 return False
         
         self.db.save_block(block)
+        metrics.BLOCK_COMMIT_SECONDS.observe_since(start)
         return True
 
     def get_block_by_height(self, height: int) -> Optional[Block]:
         return self.db.get_block_by_height(height)
 
     def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
-        return self.db.get_block_by_hash(block_hash)
\ No newline at end of file
+        return self.db.get_block_by_hash(block_hash)
+
+    def close(self):
+        self.db.close()
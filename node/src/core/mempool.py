@@ -1,11 +1,22 @@
 # node/src/core/mempool.py
-from typing import List, Dict
+import threading
+from typing import List, Dict, Iterable
 from .transaction import Transaction
+from src.telemetry import log, metrics, tracing
+
+def _tx_size(tx: Transaction) -> int:
+    """Approximate payload size of a transaction: its string fields plus three integers."""
+    return (len(tx.sender) + len(tx.to) + len(tx.data or "") + len(tx.signature or "")
+            + len(tx.hash or "") + 3 * 8)
 
 class Mempool:
-    def __init__(self):
+    def __init__(self, max_size: int = 10000):
         # A simple dictionary to store transactions, keyed by their hash
         self.transactions: Dict[str, Transaction] = {}
+        self.max_size = max_size
+        # Gossip threads and request threads touch the pool concurrently
+        self.lock = threading.Lock()
+        self.size_bytes = 0
     
     def add_transaction(self, tx: Transaction) -> (bool, str):
         """
@@ -13,26 +24,69 @@ class Mempool:
         """
         # Rule 1: Check for duplicates
         if tx.hash in self.transactions:
+            metrics.TX_REJECTED.labels("duplicate").inc()
             return False, "Duplicate transaction"
+
+        # Rule 2: Don't verify what we have no room for
+        if self.is_full():
+            metrics.TX_REJECTED.labels("mempool_full").inc()
+            return False, "Mempool full"
         
-        # Rule 2: Verify the signature
-        if not tx.verify():
+        # Rule 3: Verify the signature
+        with tracing.span('verify'):
+            valid = tx.verify()
+        if not valid:
+            metrics.TX_REJECTED.labels("invalid_signature").inc()
             return False, "Invalid signature"
 
-        # More rules will be added later (e.g., nonce check, size limits)
-        
-        self.transactions[tx.hash] = tx
-        print(f"✅ Transaction {tx.hash[:10]}... added to mempool.")
+        # More rules will be added later (e.g., nonce check)
+
+        return self.add_verified_transaction(tx)
+
+    def add_verified_transaction(self, tx: Transaction) -> (bool, str):
+        """
+        Inserts a transaction whose signature has already been checked, e.g.
+        by a front-end worker (see src/core/writer.py).
+        """
+        with tracing.span('mempool_insert'), self.lock:
+            # Re-check: another thread may have added it while we verified
+            if tx.hash in self.transactions:
+                metrics.TX_REJECTED.labels("duplicate").inc()
+                return False, "Duplicate transaction"
+            if len(self.transactions) >= self.max_size:
+                metrics.TX_REJECTED.labels("mempool_full").inc()
+                return False, "Mempool full"
+            self.transactions[tx.hash] = tx
+            self.size_bytes += _tx_size(tx)
+        metrics.TX_ADMITTED.inc()
+        log.info('tx_admitted', tx=tx.hash, sender=tx.sender[:16])
         return True, "Transaction added"
 
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def is_full(self) -> bool:
+        return len(self.transactions) >= self.max_size
+
     def get_transactions(self) -> List[Transaction]:
         """Returns all transactions currently in the mempool."""
-        return list(self.transactions.values())
+        with self.lock:
+            return list(self.transactions.values())
 
     def get_transaction_by_hash(self, tx_hash: str) -> Transaction:
         """Returns a single transaction by its hash."""
         return self.transactions.get(tx_hash)
 
+    def remove_transactions(self, tx_hashes: Iterable[str]):
+        """Removes the given transactions, e.g. once they are included in a block."""
+        with self.lock:
+            for tx_hash in tx_hashes:
+                tx = self.transactions.pop(tx_hash, None)
+                if tx is not None:
+                    self.size_bytes -= _tx_size(tx)
+
     def clear(self):
         """Clears all transactions from the mempool."""
-        self.transactions.clear()
\ No newline at end of file
+        with self.lock:
+            self.transactions.clear()
+            self.size_bytes = 0
@@ -2,6 +2,7 @@
 import math
 from typing import List
 from src.crypto.wallet import hash_data
+from src.telemetry import metrics
 
 def build_merkle_root(items: List[str]) -> str:
     """
@@ -11,6 +12,7 @@ def build_merkle_root(items: List[str]) -> str:
     if not items:
         return hash_data('').hex() # A default hash for an empty list
 
+    start = metrics.start()
     # Create the first level of leaves
     leaves = [hash_data(item) for item in items]
 
@@ -27,4 +29,5 @@ def build_merkle_root(items: List[str]) -> str:
         
         leaves = new_level
         
+    metrics.MERKLE_BUILD_SECONDS.observe_since(start)
     return leaves[0].hex()
\ No newline at end of file
@@ -0,0 +1,88 @@
+# node/src/core/node.py
+import threading
+from typing import List, Optional
+from src.core.mempool import Mempool
+from src.core.block import Block
+from src.core.blockchain import Blockchain
+from src.core.admission import AdmissionController
+from src.telemetry import metrics
+
+BLOCK_ACCEPTED = 'accepted'
+BLOCK_KNOWN = 'known'
+BLOCK_REJECTED = 'rejected'
+
+class Node:
+    """
+    Holds all per-node state: mempool, blockchain, admission control, peers
+    and the gossip transport.
+    One instance is created per Flask app, so several nodes can live in the
+    same process (see bench/cluster.py).
+    """
+    def __init__(self,
+                 node_id: str,
+                 data_dir: str = "data",
+                 peers: Optional[List[str]] = None,
+                 transport=None,
+                 admission: Optional[AdmissionController] = None,
+                 mempool_max_size: int = 10000):
+        self.node_id = node_id
+        self.data_dir = data_dir
+        self.peers = peers or []
+        self.transport = transport
+        self.mempool = Mempool(max_size=mempool_max_size)
+        self.admission = admission or AdmissionController()
+        self._blockchain: Optional[Blockchain] = None
+        self._blockchain_lock = threading.Lock()
+        # Serializes block-level changes: forging and importing read the head,
+        # write a block and prune the mempool as one step.
+        self._write_lock = threading.Lock()
+
+    @property
+    def blockchain(self) -> Blockchain:
+        """The blockchain is opened lazily, on first use."""
+        if self._blockchain is None:
+            with self._blockchain_lock:
+                if self._blockchain is None:
+                    self._blockchain = Blockchain(node_id=self.node_id, data_dir=self.data_dir)
+        return self._blockchain
+
+    def metrics_snapshot(self) -> dict:
+        """Refreshes the gauges and returns this process's metrics."""
+        metrics.MEMPOOL_TRANSACTIONS.set(len(self.mempool))
+        metrics.MEMPOOL_BYTES.set(self.mempool.size_bytes)
+        metrics.ADMISSION_QUEUE_DEPTH.set(self.admission.queue_depth)
+        return metrics.REGISTRY.snapshot()
+
+    def forge_block(self) -> Block:
+        """Builds a block from the whole mempool on top of our head and commits it."""
+        with self._write_lock:
+            last_block = self.blockchain.get_head()
+            txs_to_include = self.mempool.get_transactions()
+            new_block = Block(
+                index=last_block.header['index'] + 1,
+                prev_hash=last_block.hash,
+                proposer_id=self.node_id,
+                transactions=txs_to_include
+            )
+            self.blockchain.add_block(new_block)
+            # Anything that arrived while we were forging stays for the next block
+            self.mempool.remove_transactions(tx.hash for tx in txs_to_include)
+        return new_block
+
+    def import_block(self, block: Block) -> str:
+        """
+        Saves a block forged by a peer and drops its transactions from the
+        mempool. Returns BLOCK_ACCEPTED, BLOCK_KNOWN or BLOCK_REJECTED.
+        """
+        with self._write_lock:
+            if self.blockchain.get_block_by_hash(block.hash):
+                return BLOCK_KNOWN
+            if not self.blockchain.add_block(block):
+                return BLOCK_REJECTED
+            self.mempool.remove_transactions(tx.hash for tx in block.transactions)
+        return BLOCK_ACCEPTED
+
+    def close(self):
+        if self._blockchain is not None:
+            self._blockchain.close()
+            self._blockchain = None
@@ -0,0 +1,303 @@
+# node/src/core/writer.py
+"""
+Single-writer core for the multi-worker serving mode (see serve.py).
+
+LevelDB can only be opened by one process, and the mempool must be shared,
+so one writer process owns the Node (mempool, blockchain, database) and
+serves the front-end workers over a local Unix socket:
+
+  - reads run directly on the connection's thread,
+  - mutations are queued and applied one at a time by a single thread, in
+    arrival order.
+
+Front-end workers use RemoteNode, which has the same interface as Node.
+Signature verification happens in the worker, so only already-verified
+transactions reach the writer. Rate limits are also kept by the writer,
+so they hold for the node as a whole however many workers there are.
+
+Workers push their metrics to the writer every METRICS_PUSH_INTERVAL
+seconds and on each scrape. The writer adds the latest snapshot of every
+worker it has heard from to its own, so whichever worker serves /metrics,
+counters only go up.
+"""
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Iterable, List, Optional
+
+from src.core.admission import AdmissionController, Rejection
+from src.core.block import Block
+from src.core.node import Node
+from src.core.transaction import Transaction
+from src.telemetry import log, metrics, tracing
+
+class WriterError(Exception):
+    """The writer failed to apply an operation."""
+    pass
+
+class WriterUnavailable(WriterError):
+    """The writer process could not be reached."""
+    pass
+
+# --- Writer process side ---
+
+class WriterServer:
+    # Operations that may run concurrently on the connection's thread: reads,
+    # and rate limit checks, which have their own lock.
+    CONCURRENT = {'mempool.get', 'mempool.list', 'mempool.len', 'mempool.bytes', 'mempool.is_full',
+                  'chain.head', 'chain.by_height', 'chain.by_hash', 'metrics.push', 'metrics.collect',
+                  'admission.check_rate', 'admission.refund_rate', 'admission.rate_stats'}
+
+    def __init__(self, node: Node, address: str, authkey: bytes):
+        self.node = node
+        self.listener = Listener(address, family='AF_UNIX', authkey=authkey)
+        self.mutations: 'queue.Queue' = queue.Queue()
+        # worker pid -> latest metrics snapshot; kept after a worker exits so
+        # its counts stay in the totals
+        self.worker_metrics = {}
+        self.ops = {
+            'mempool.add_verified': node.mempool.add_verified_transaction,
+            'mempool.remove': node.mempool.remove_transactions,
+            'mempool.get': node.mempool.get_transaction_by_hash,
+            'mempool.list': node.mempool.get_transactions,
+            'mempool.len': lambda: len(node.mempool),
+            'mempool.bytes': lambda: node.mempool.size_bytes,
+            'mempool.is_full': node.mempool.is_full,
+            'chain.add': lambda block: node.blockchain.add_block(block),
+            'chain.head': lambda: node.blockchain.get_head(),
+            'chain.by_height': lambda height: node.blockchain.get_block_by_height(height),
+            'chain.by_hash': lambda block_hash: node.blockchain.get_block_by_hash(block_hash),
+            'node.forge_block': node.forge_block,
+            'node.import_block': node.import_block,
+            'admission.check_rate': node.admission.check_rate,
+            'admission.refund_rate': node.admission.refund_rate,
+            'admission.rate_stats': node.admission.rate_stats,
+            'metrics.push': self.push_metrics,
+            'metrics.collect': self.collect_metrics
+        }
+
+    def serve_forever(self):
+        threading.Thread(target=self._apply_mutations, name='writer', daemon=True).start()
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, OSError) as e:
+                log.warning('writer_connection_rejected', error=str(e))
+                continue
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                if op in self.CONCURRENT:
+                    reply = self._run(op, args)
+                else:
+                    done = Future()
+                    self.mutations.put((op, args, done))
+                    reply = done.result()
+                conn.send(reply)
+
+    def _apply_mutations(self):
+        """The only thread that changes the node's state."""
+        while True:
+            op, args, done = self.mutations.get()
+            done.set_result(self._run(op, args))
+
+    def push_metrics(self, worker: int, snapshot: dict):
+        self.worker_metrics[worker] = snapshot
+
+    def collect_metrics(self, worker: int, snapshot: dict) -> dict:
+        """The node's metrics: the writer's (LevelDB, block commits, mempool) plus every worker's."""
+        self.worker_metrics[worker] = snapshot
+        return metrics.REGISTRY.combine(self.node.metrics_snapshot(), *list(self.worker_metrics.values()))
+
+    def _run(self, op: str, args: tuple):
+        handler = self.ops.get(op)
+        if handler is None:
+            return False, f"Unknown operation {op}"
+        try:
+            return True, handler(*args)
+        except Exception as e:
+            return False, f"{type(e).__name__}: {e}"
+
+    def close(self):
+        self.listener.close()
+
+def run_writer(node: Node, address: str, authkey: bytes, ready=None):
+    """Entry point of the writer process."""
+    node.blockchain # open the database before accepting requests
+    server = WriterServer(node, address, authkey)
+    if ready is not None:
+        ready.set()
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+        node.close()
+
+# --- Front-end side ---
+
+class WriterClient:
+    """
+    Calls operations on the writer. Connections are pooled and each is used
+    by one request thread at a time.
+    """
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._idle: 'queue.LifoQueue' = queue.LifoQueue()
+
+    def call(self, op: str, *args):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            except OSError as e:
+                raise WriterUnavailable(f"Cannot connect to writer at {self.address}: {e}") from e
+        try:
+            conn.send((op, args))
+            ok, result = conn.recv()
+        except (EOFError, OSError) as e:
+            conn.close()
+            raise WriterUnavailable(f"Lost connection to writer: {e}") from e
+        self._idle.put(conn)
+        if not ok:
+            raise WriterError(result)
+        return result
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class RemoteMempool:
+    """Mempool interface backed by the writer. Signatures are verified locally."""
+    def __init__(self, writer: WriterClient):
+        self.writer = writer
+
+    def add_transaction(self, tx: Transaction) -> (bool, str):
+        with tracing.span('verify'):
+            valid = tx.verify()
+        if not valid:
+            metrics.TX_REJECTED.labels("invalid_signature").inc()
+            return False, "Invalid signature"
+        return self.writer.call('mempool.add_verified', tx)
+
+    def __len__(self) -> int:
+        return self.writer.call('mempool.len')
+
+    @property
+    def size_bytes(self) -> int:
+        return self.writer.call('mempool.bytes')
+
+    def is_full(self) -> bool:
+        return self.writer.call('mempool.is_full')
+
+    def get_transactions(self) -> List[Transaction]:
+        return self.writer.call('mempool.list')
+
+    def get_transaction_by_hash(self, tx_hash: str) -> Optional[Transaction]:
+        return self.writer.call('mempool.get', tx_hash)
+
+    def remove_transactions(self, tx_hashes: Iterable[str]):
+        self.writer.call('mempool.remove', list(tx_hashes))
+
+class RemoteBlockchain:
+    """Blockchain interface backed by the writer."""
+    def __init__(self, writer: WriterClient):
+        self.writer = writer
+
+    def get_head(self) -> Optional[Block]:
+        return self.writer.call('chain.head')
+
+    def add_block(self, block: Block) -> bool:
+        return self.writer.call('chain.add', block)
+
+    def get_block_by_height(self, height: int) -> Optional[Block]:
+        return self.writer.call('chain.by_height', height)
+
+    def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
+        return self.writer.call('chain.by_hash', block_hash)
+
+    def close(self):
+        pass
+
+class RemoteAdmissionController(AdmissionController):
+    """
+    Size and format checks and the verification queue stay in the worker;
+    rate limits are checked against the writer's buckets.
+    """
+    def __init__(self, writer: WriterClient, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    def check_rate(self, sender: str, source: Optional[str] = None) -> Optional[Rejection]:
+        return self.writer.call('admission.check_rate', sender, source)
+
+    def refund_rate(self, sender: str, source: Optional[str] = None):
+        self.writer.call('admission.refund_rate', sender, source)
+
+    def rate_stats(self) -> dict:
+        return self.writer.call('admission.rate_stats')
+
+class RemoteNode:
+    """What a front-end worker uses in place of Node: local admission and gossip, remote state."""
+    METRICS_PUSH_INTERVAL = 1.0
+
+    def __init__(self,
+                 writer: WriterClient,
+                 node_id: str,
+                 data_dir: str = "data",
+                 peers: Optional[List[str]] = None,
+                 transport=None,
+                 admission: Optional[AdmissionController] = None):
+        self.writer = writer
+        self.node_id = node_id
+        self.data_dir = data_dir
+        self.peers = peers or []
+        self.transport = transport
+        self.admission = admission or AdmissionController()
+        self.mempool = RemoteMempool(writer)
+        self.blockchain = RemoteBlockchain(writer)
+        self._closed = threading.Event()
+        # Pushes must reach the writer in the order they were taken, or an
+        # older snapshot could replace a newer one and counters would drop
+        self._metrics_lock = threading.Lock()
+        threading.Thread(target=self._push_metrics, name='metrics-push', daemon=True).start()
+
+    def _local_metrics(self) -> dict:
+        metrics.ADMISSION_QUEUE_DEPTH.set(self.admission.queue_depth)
+        return metrics.REGISTRY.snapshot()
+
+    def _push_metrics(self):
+        while not self._closed.wait(self.METRICS_PUSH_INTERVAL):
+            try:
+                with self._metrics_lock:
+                    self.writer.call('metrics.push', os.getpid(), self._local_metrics())
+            except WriterError as e:
+                log.debug('metrics_push_failed', error=str(e))
+
+    def metrics_snapshot(self) -> dict:
+        """The whole node's metrics, as added up by the writer."""
+        with self._metrics_lock:
+            return self.writer.call('metrics.collect', os.getpid(), self._local_metrics())
+
+    def forge_block(self) -> Block:
+        return self.writer.call('node.forge_block')
+
+    def import_block(self, block: Block) -> str:
+        return self.writer.call('node.import_block', block)
+
+    def close(self):
+        self._closed.set()
+        self.writer.close()
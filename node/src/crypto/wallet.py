@@ -2,6 +2,7 @@ import os
 import binascii
 from Crypto.Hash import keccak
 from ecdsa import SigningKey, VerifyingKey, SECP256k1 
+from src.telemetry import log, metrics
 
 class Wallet:
     """
@@ -47,6 +48,7 @@ def sign_data(wallet: Wallet, data_hash: bytes) -> str:
     return signature_bytes.hex()
 
 def verify_signature(public_key_hex: str, signature_hex: str, data_hash: bytes) -> bool:
+    start = metrics.start()
     try:
         pub_key_bytes = bytes.fromhex(public_key_hex)
         verifying_key = VerifyingKey.from_string(pub_key_bytes, curve=SECP256k1)
@@ -55,5 +57,8 @@ def verify_signature(public_key_hex: str, signature_hex: str, data_hash: bytes)
         
         return verifying_key.verify_digest(signature_bytes, data_hash)
     except Exception as e:
-        print(f"Error during verification: {e}")
-        return False
\ No newline at end of file
+        # Malformed keys and signatures from clients end up here; rate limited by default
+        log.warning('signature_error', error=str(e))
+        return False
+    finally:
+        metrics.SIGNATURE_VERIFY_SECONDS.observe_since(start)
\ No newline at end of file
@@ -4,11 +4,12 @@ import plyvel
 import json
 from typing import Optional
 from src.core.block import Block
+from src.telemetry import log, metrics
 
 class Database:
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, data_dir: str = "data"):
         # Each node will have its own database directory
-        db_path = f"data/{node_id}_chain"
+        db_path = os.path.join(data_dir, f"{node_id}_chain")
         os.makedirs(db_path, exist_ok=True)
         self.db = plyvel.DB(db_path, create_if_missing=True)
         
@@ -22,6 +23,7 @@ class Database:
         block_hash_bytes = bytes.fromhex(block.hash)
         block_data = json.dumps(block.to_dict()).encode('utf-8')
         
+        start = metrics.start()
         with self.db.write_batch() as wb:
             # Store the block by its hash: block:<hash> -> block_data
             wb.put(self.BLOCK_PREFIX + block_hash_bytes, block_data)
@@ -29,25 +31,34 @@ class Database:
             wb.put(self.INDEX_PREFIX + str(block.header['index']).encode(), block_hash_bytes)
             # Update the head hash pointer
             wb.put(self.HEAD_HASH_KEY, block_hash_bytes)
-        print(f" Saved block {block.header['index']} with hash {block.hash[:10]}...")
+        metrics.DB_WRITE_SECONDS.observe_since(start)
+        log.info('block_saved', index=block.header['index'], block=block.hash,
+                 transactions=len(block.transactions))
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        """A single timed LevelDB read."""
+        start = metrics.start()
+        value = self.db.get(key)
+        metrics.DB_READ_SECONDS.observe_since(start)
+        return value
 
     def get_block_by_hash(self, block_hash: str) -> Optional[Block]:
         """Retrieves a block by its hash."""
-        block_data = self.db.get(self.BLOCK_PREFIX + bytes.fromhex(block_hash))
+        block_data = self._get(self.BLOCK_PREFIX + bytes.fromhex(block_hash))
         if block_data:
             return Block.from_dict(json.loads(block_data.decode('utf-8')))
         return None
 
     def get_block_by_height(self, height: int) -> Optional[Block]:
         """Retrieves a block by its height."""
-        block_hash_bytes = self.db.get(self.INDEX_PREFIX + str(height).encode())
+        block_hash_bytes = self._get(self.INDEX_PREFIX + str(height).encode())
         if block_hash_bytes:
             return self.get_block_by_hash(block_hash_bytes.hex())
         return None
 
     def get_head_block(self) -> Optional[Block]:
         """Retrieves the latest block in the chain."""
-        head_hash_bytes = self.db.get(self.HEAD_HASH_KEY)
+        head_hash_bytes = self._get(self.HEAD_HASH_KEY)
         if head_hash_bytes:
             return self.get_block_by_hash(head_hash_bytes.hex())
         return None
@@ -1,39 +1,125 @@
 # node/src/p2p/gossip.py
 import os
-import requests
+import queue
 from threading import Thread
+from typing import List, Optional
 from src.core.transaction import Transaction
+from src.core.block import Block
+from src.p2p.transport import HttpTransport, TransportError
+from src.telemetry import log, metrics
 
 # Read the list of peers from the environment variable
 PEERS = os.environ.get('PEERS', '').split(',')
 # Filter out any empty strings that might result from a trailing comma
 PEERS = [peer for peer in PEERS if peer]
 
-def broadcast_transaction(tx: Transaction):
+# Messages waiting to be sent, and the threads sending them
+GOSSIP_QUEUE_SIZE = int(os.environ.get('GOSSIP_QUEUE_SIZE', 1000))
+GOSSIP_WORKERS = int(os.environ.get('GOSSIP_WORKERS', 4))
+
+# Used when the caller does not supply its own transport
+default_transport = HttpTransport()
+
+class _Sender:
+    """
+    A fixed number of threads sending queued messages to peers, so a burst
+    of transactions does not start one thread each. When the queue is full,
+    transactions are dropped; blocks wait for room.
+    """
+    def __init__(self, workers: int, capacity: int):
+        self.workers = workers
+        self.capacity = capacity
+        self._start()
+
+    def _start(self):
+        self._queue: 'queue.Queue' = queue.Queue(self.capacity)
+        for i in range(self.workers):
+            Thread(target=self._run, name=f"gossip-{i}", daemon=True).start()
+
+    def after_fork(self):
+        """Threads do not survive fork(): start over with an empty queue."""
+        self._start()
+
+    def submit(self, send, *args, wait: bool = False) -> bool:
+        try:
+            self._queue.put((send, args), block=wait)
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self):
+        while True:
+            send, args = self._queue.get()
+            try:
+                send(*args)
+            except Exception as e:
+                log.error('gossip_error', error=f"{type(e).__name__}: {e}")
+
+_sender = _Sender(GOSSIP_WORKERS, GOSSIP_QUEUE_SIZE)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: _sender.after_fork())
+
+def broadcast_transaction(tx: Transaction, peers: Optional[List[str]] = None, transport=None):
     """
     Broadcasts a transaction to all peers in the network.
-    This is done in a separate thread to not block the main API response.
+    The sending happens on the gossip threads, so the API responds right away.
     """
-    print(f" gossiping transaction {tx.hash[:10]}... to {len(PEERS)} peers.")
-    
-    # We use a thread so the user gets a fast response from the API,
-    # while the broadcast happens in the background.
-    thread = Thread(target=_send_to_peers, args=(tx,))
-    thread.start()
-
-def _send_to_peers(tx: Transaction):
+    peers = PEERS if peers is None else peers
+    if not peers:
+        return
+    log.debug('gossip_broadcast', kind='tx', tx=tx.hash, peers=len(peers))
+    if not _sender.submit(_send_to_peers, tx, peers, transport or default_transport):
+        metrics.GOSSIP_DROPPED.labels("tx").inc()
+        log.warning('gossip_dropped', kind='tx', tx=tx.hash)
+
+def broadcast_block(block: Block, peers: Optional[List[str]] = None, transport=None):
+    """Broadcasts a newly forged block to all peers from the gossip threads."""
+    peers = PEERS if peers is None else peers
+    if not peers:
+        return
+    log.info('gossip_broadcast', kind='block', index=block.header['index'], block=block.hash,
+             peers=len(peers))
+    _sender.submit(_send_block_to_peers, block, peers, transport or default_transport, wait=True)
+
+def _observe_send(start: float, peer: str, kind: str):
+    if start:
+        metrics.GOSSIP_SEND_SECONDS.labels(peer, kind).observe_since(start)
+
+def _send_to_peers(tx: Transaction, peers: List[str], transport):
     """The actual function that sends the transaction to each peer."""
     tx_data = tx.to_dict()
 
-    for peer in PEERS:
-        url = f"{peer}/gossip/tx"
+    for peer in peers:
+        start = metrics.start()
+        try:
+            # We expect a 202 Accepted response.
+            status, body = transport.post(peer, "/gossip/tx", tx_data)
+            if status == 202:
+                log.debug('gossip_sent', kind='tx', tx=tx.hash, peer=peer)
+            elif status != 208:
+                # 208 means the peer already had it, which is okay.
+                log.warning('gossip_peer_error', kind='tx', tx=tx.hash, peer=peer, status=status,
+                            body=body[:200])
+        except TransportError as e:
+            log.warning('gossip_send_failed', kind='tx', tx=tx.hash, peer=peer, error=str(e))
+        finally:
+            # Timeouts and failures included: they are the slow-peer case
+            _observe_send(start, peer, "tx")
+
+def _send_block_to_peers(block: Block, peers: List[str], transport):
+    """Sends a block to each peer."""
+    block_data = block.to_dict()
+
+    for peer in peers:
+        start = metrics.start()
         try:
-            # We expect a 202 Accepted response. Timeout is important.
-            response = requests.post(url, json=tx_data, timeout=2)
-            if response.status_code == 202:
-                print(f"  -> Successfully sent tx {tx.hash[:10]} to {peer}")
-            else:
-                # The peer might already have the tx, which is okay.
-                print(f"  -> Peer {peer} responded with {response.status_code}: {response.text}")
-        except requests.exceptions.RequestException as e:
-            print(f"  -> Failed to send tx to {peer}. Error: {e}")
\ No newline at end of file
+            status, body = transport.post(peer, "/gossip/block", block_data)
+            if status == 202:
+                log.debug('gossip_sent', kind='block', block=block.hash, peer=peer)
+            elif status != 208:
+                log.warning('gossip_peer_error', kind='block', block=block.hash, peer=peer, status=status,
+                            body=body[:200])
+        except TransportError as e:
+            log.warning('gossip_send_failed', kind='block', block=block.hash, peer=peer, error=str(e))
+        finally:
+            _observe_send(start, peer, "block")
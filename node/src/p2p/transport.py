@@ -0,0 +1,26 @@
+# node/src/p2p/transport.py
+from typing import Tuple
+import requests
+
+class TransportError(Exception):
+    """Raised when a message could not be delivered to a peer."""
+    pass
+
+class HttpTransport:
+    """
+    The default transport: sends gossip messages to peers over HTTP.
+    Other transports (e.g. the in-process one used by bench/cluster.py) only
+    need to provide the same `post` method.
+    """
+    def __init__(self, timeout: float = 2):
+        self.timeout = timeout
+        # A shared session keeps connections to peers alive between messages.
+        self.session = requests.Session()
+
+    def post(self, peer: str, path: str, payload: dict) -> Tuple[int, str]:
+        """Sends `payload` as JSON to `peer` + `path` and returns (status_code, body)."""
+        try:
+            response = self.session.post(f"{peer}{path}", json=payload, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return response.status_code, response.text
@@ -0,0 +1,221 @@
+# node/src/telemetry/log.py
+"""
+Structured, asynchronous event log.
+
+    log.info('tx_admitted', tx=tx.hash)
+    log.warning('gossip_send_failed', peer=peer, error=str(e))
+
+Calling code only appends (timestamp, level, event, fields) to a bounded
+in-memory queue; a background thread formats the records and writes them
+in batches. The request path therefore never waits on stderr or a file:
+if the writer falls behind and the queue is full, new records are dropped
+and counted in coldchain_log_records_dropped_total.
+
+Records go to stderr, not stdout: print() writes a line in several pieces,
+so output printed by the benchmarks, the simulator or serve.py could be
+spliced into the middle of a record (and the other way round).
+
+Noisy events can be sampled (keep a fraction) or rate limited (at most N
+per second, with a summary of what was suppressed) per event name.
+
+Configured from the environment:
+  LOG_LEVEL        debug, info (default), warning or error
+  LOG_FORMAT       json (default) or text
+  LOG_FILE         append to this file instead of stderr
+  LOG_QUEUE_SIZE   records held before dropping (default 10000)
+  LOG_SAMPLE       e.g. "tx_admitted=0.1,gossip_sent=0.01"
+  LOG_RATE_LIMIT   e.g. "tx_rejected=50"; merged over DEFAULT_RATE_LIMITS
+"""
+import atexit
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, TextIO
+
+from src.telemetry import metrics
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning', ERROR: 'error'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+# Events that can fire once per request or per peer when something is wrong
+DEFAULT_RATE_LIMITS = {
+    'tx_rejected': 20,
+    'gossip_tx_rejected': 20,
+    'signature_error': 5,
+    'gossip_send_failed': 10,
+    'gossip_dropped': 10,
+    'gossip_peer_error': 10
+}
+
+LOG_RECORDS_DROPPED = metrics.Counter(
+    'coldchain_log_records_dropped_total', 'Log records not written, by event and reason.', ['event', 'reason'])
+
+def _parse_event_map(value: str) -> Dict[str, float]:
+    """Parses "event=number,event=number"."""
+    result = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, number = item.partition('=')
+        result[name.strip()] = float(number)
+    return result
+
+class EventLog:
+    def __init__(self,
+                 stream: Optional[TextIO] = None,
+                 level: int = INFO,
+                 fmt: str = 'json',
+                 capacity: int = 10000,
+                 batch_size: int = 512,
+                 flush_interval: float = 0.2,
+                 sample_rates: Optional[Dict[str, float]] = None,
+                 rate_limits: Optional[Dict[str, float]] = None):
+        self.stream = stream or sys.stderr
+        self.level = level
+        self.fmt = fmt
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits)
+        self._queue: deque = deque()
+        # event -> [second, emitted, suppressed], shared by the request
+        # threads and the writer thread's summaries
+        self._windows: Dict[str, list] = {}
+        self._limit_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def after_fork(self):
+        """Threads do not survive fork(): start over with an empty queue and a new writer."""
+        self._queue = deque()
+        self._windows = {}
+        self._limit_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start()
+
+    # --- Request path: no formatting and no I/O ---
+
+    def emit(self, level: int, event: str, fields: dict):
+        if level < self.level:
+            return
+        rate = self.sample_rates.get(event)
+        if rate is not None and random.random() >= rate:
+            LOG_RECORDS_DROPPED.labels(event, 'sampled').inc()
+            return
+        limit = self.rate_limits.get(event)
+        if limit is not None and not self._within_limit(event, limit):
+            LOG_RECORDS_DROPPED.labels(event, 'rate_limited').inc()
+            return
+        self._enqueue((time.time(), level, event, fields))
+
+    def _enqueue(self, record: tuple):
+        if len(self._queue) >= self.capacity:
+            LOG_RECORDS_DROPPED.labels(record[2], 'queue_full').inc()
+            return
+        self._queue.append(record)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _within_limit(self, event: str, limit: float) -> bool:
+        second = int(time.monotonic())
+        with self._limit_lock:
+            window = self._windows.get(event)
+            if window is None or window[0] != second:
+                if window is not None and window[2]:
+                    self._report_suppressed(event, window)
+                window = self._windows[event] = [second, 0, 0]
+            if window[1] >= limit:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+    def _report_suppressed(self, event: str, window: list):
+        """Queues the summary for `window` and resets its count; call with _limit_lock held."""
+        count, window[2] = window[2], 0
+        self._enqueue((time.time(), WARNING, 'log_suppressed', {'suppressedEvent': event, 'count': count}))
+
+    # --- Writer thread ---
+
+    def _run(self):
+        wakeup = self._wakeup
+        while True:
+            wakeup.wait(self.flush_interval)
+            wakeup.clear()
+            self._report_finished_windows()
+            self.flush()
+
+    def _report_finished_windows(self):
+        """Reports suppressed counts of past seconds, even if the event has not fired since."""
+        second = int(time.monotonic())
+        with self._limit_lock:
+            for event, window in self._windows.items():
+                if window[0] != second and window[2]:
+                    self._report_suppressed(event, window)
+
+    def flush(self):
+        """Writes out everything queued so far, in batches."""
+        with self._write_lock:
+            while self._queue:
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._format(self._queue.popleft()))
+                try:
+                    self.stream.write(''.join(batch))
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    # Closed or broken stream; there is nowhere left to report it
+                    LOG_RECORDS_DROPPED.labels('*', 'write_error').inc(len(batch))
+
+    def _format(self, record: tuple) -> str:
+        ts, level, event, fields = record
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(ts)) + f".{int(ts % 1 * 1000):03d}Z"
+        if self.fmt == 'text':
+            details = ' '.join(f"{key}={value}" for key, value in fields.items())
+            return f"{timestamp} {LEVEL_NAMES[level]:<7} {event} {details}\n"
+        return json.dumps({'ts': timestamp, 'level': LEVEL_NAMES[level], 'event': event, **fields},
+                          default=str) + '\n'
+
+def _from_env() -> EventLog:
+    rate_limits = dict(DEFAULT_RATE_LIMITS)
+    rate_limits.update(_parse_event_map(os.environ.get('LOG_RATE_LIMIT', '')))
+    log_file = os.environ.get('LOG_FILE')
+    return EventLog(
+        stream=open(log_file, 'a', buffering=1 << 16) if log_file else None,
+        level=LEVELS.get(os.environ.get('LOG_LEVEL', 'info').lower(), INFO),
+        fmt=os.environ.get('LOG_FORMAT', 'json'),
+        capacity=int(os.environ.get('LOG_QUEUE_SIZE', 10000)),
+        sample_rates=_parse_event_map(os.environ.get('LOG_SAMPLE', '')),
+        rate_limits=rate_limits
+    )
+
+_log = _from_env()
+atexit.register(_log.flush)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=lambda: _log.after_fork())
+
+def get_log() -> EventLog:
+    return _log
+
+def debug(event: str, **fields):
+    _log.emit(DEBUG, event, fields)
+
+def info(event: str, **fields):
+    _log.emit(INFO, event, fields)
+
+def warning(event: str, **fields):
+    _log.emit(WARNING, event, fields)
+
+def error(event: str, **fields):
+    _log.emit(ERROR, event, fields)
@@ -0,0 +1,273 @@
+# node/src/telemetry/metrics.py
+"""
+A small, dependency-free metrics layer rendered in the Prometheus text format.
+
+Instrumented code follows this pattern so that it costs only two cheap
+calls when metrics are disabled:
+
+    start = metrics.start()
+    ... work ...
+    SOME_HISTOGRAM.observe_since(start)
+
+`start()` returns 0.0 while disabled and `observe_since(0.0)` returns
+immediately.
+"""
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_enabled = os.environ.get('METRICS_ENABLED', '1') != '0'
+
+# Latency buckets in seconds, from 10us (hashing) up to 2.5s (slow peers)
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                   0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def set_enabled(enabled: bool):
+    global _enabled
+    _enabled = bool(enabled)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def start() -> float:
+    """Returns a start timestamp, or 0.0 if metrics are disabled."""
+    return perf_counter() if _enabled else 0.0
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    """Common parts of all metric types: name, help text and labelled children."""
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry or REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Returns the child series for the given label values, creating it on first use."""
+        if not _enabled:
+            return _NOOP_CHILD
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _unlabelled(self):
+        return self._children[()]
+
+    def snapshot(self) -> Dict[Tuple[str, ...], object]:
+        """Current values of all series, in a form that can be pickled and merged."""
+        return {key: child.snapshot() for key, child in list(self._children.items())}
+
+    def combine(self, *snapshots: Dict[Tuple[str, ...], object]) -> Dict[Tuple[str, ...], object]:
+        """Adds up snapshots of this metric from several processes, series by series."""
+        values = {}
+        for snapshot in snapshots:
+            for key, value in snapshot.items():
+                values[key] = self._combine(values[key], value) if key in values else value
+        return values
+
+    def collect(self, values: Optional[Dict[Tuple[str, ...], object]] = None) -> List[str]:
+        """Renders the series; `values` replaces this process's own (see Registry.combine)."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        if values is None:
+            values = self.snapshot()
+        for key, value in values.items():
+            lines.extend(self._render(list(zip(self.labelnames, key)), value))
+        return lines
+
+    def _combine(self, a, b):
+        return a + b
+
+    def _render(self, labels, value) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}"]
+
+class _NoopChild:
+    """Stands in for every labelled series while metrics are disabled."""
+    def inc(self, amount: float = 1):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+    def observe_since(self, start: float):
+        pass
+
+_NOOP_CHILD = _NoopChild()
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        if not _enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+class _GaugeChild(_CounterChild):
+    def set(self, value: float):
+        if not _enabled:
+            return
+        self.value = value
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        if not _enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def observe_since(self, start: float):
+        if start:
+            self.observe(perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._unlabelled().inc(amount)
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._unlabelled().set(value)
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def _combine(self, a, b):
+        return [x + y for x, y in zip(a[0], b[0])], a[1] + b[1]
+
+    def _render(self, labels, value) -> List[str]:
+        counts, total_sum = value
+        lines = []
+        cumulative = 0
+        for upper, count in zip(list(self.buckets) + [float('inf')], counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', _format_value(upper))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total_sum)}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+
+    def observe_since(self, start: float):
+        if start:
+            self._unlabelled().observe(perf_counter() - start)
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric):
+        self._metrics.append(metric)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def combine(self, *snapshots: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Adds up snapshot()s taken in several processes (e.g. serve.py's writer and workers)."""
+        return {metric.name: metric.combine(*(snapshot.get(metric.name, {}) for snapshot in snapshots))
+                for metric in self._metrics}
+
+    def render(self, snapshot: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Renders every metric in the text format: this process's values, or
+        `snapshot` instead (e.g. the combined one from serve.py's writer).
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect(None if snapshot is None else snapshot.get(metric.name, {})))
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# --- The node's series ---
+
+SIGNATURE_VERIFY_SECONDS = Histogram(
+    'coldchain_signature_verify_seconds', 'Time spent verifying one ECDSA signature.')
+MERKLE_BUILD_SECONDS = Histogram(
+    'coldchain_merkle_build_seconds', 'Time spent building a Merkle root.')
+DB_READ_SECONDS = Histogram(
+    'coldchain_leveldb_read_seconds', 'LevelDB read latency.')
+DB_WRITE_SECONDS = Histogram(
+    'coldchain_leveldb_write_seconds', 'LevelDB write (batch) latency.')
+BLOCK_COMMIT_SECONDS = Histogram(
+    'coldchain_block_commit_seconds', 'Time to validate and persist a block.')
+GOSSIP_SEND_SECONDS = Histogram(
+    'coldchain_gossip_send_seconds', 'Latency of one gossip message to a peer.', ['peer', 'kind'])
+GOSSIP_DROPPED = Counter(
+    'coldchain_gossip_dropped_total', 'Gossip messages not sent because the send queue was full.', ['kind'])
+
+TX_ADMITTED = Counter(
+    'coldchain_transactions_admitted_total', 'Transactions admitted to the mempool.')
+TX_REJECTED = Counter(
+    'coldchain_transactions_rejected_total', 'Transactions rejected, by reason.', ['reason'])
+
+MEMPOOL_TRANSACTIONS = Gauge(
+    'coldchain_mempool_transactions', 'Transactions currently in the mempool.')
+MEMPOOL_BYTES = Gauge(
+    'coldchain_mempool_bytes', 'Approximate payload bytes of the transactions in the mempool.')
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'coldchain_admission_queue_depth', 'Transactions waiting for a signature verification slot.')
@@ -0,0 +1,59 @@
+# node/src/telemetry/profiler.py
+"""
+A low-overhead sampling profiler for all threads of the process.
+
+Every 1/hz seconds it snapshots the stack of every thread (request
+threads, gossip workers, ...) with sys._current_frames() and counts
+identical stacks. The result is in the "collapsed stack" format understood
+by flamegraph.pl and speedscope:
+
+    thread-name;module:function;module:function 42
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict
+
+# Only one profile at a time: concurrent samplers would skew each other.
+_profile_lock = threading.Lock()
+
+class ProfilerBusy(Exception):
+    """Raised when a profile is requested while another is still running."""
+    pass
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+def sample(seconds: float, hz: int = 100) -> Dict[str, int]:
+    """Samples all threads except the caller for `seconds` and returns stack counts."""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        own_ident = threading.get_ident()
+        interval = 1.0 / hz
+        stacks = Counter()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread-{ident}"))
+                stacks[';'.join(reversed(labels))] += 1
+            time.sleep(interval)
+        return dict(stacks)
+    finally:
+        _profile_lock.release()
+
+def to_collapsed(stacks: Dict[str, int]) -> str:
+    """Renders stack counts as collapsed-stack lines, most frequent first."""
+    lines = [f"{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda item: -item[1])]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,112 @@
+# node/src/telemetry/tracing.py
+"""
+Sampled per-request trace spans.
+
+A view decorated with @traced starts a trace for a `sample_rate` fraction
+of requests. Code anywhere below it (e.g. the mempool) marks its stages
+with `with span("verify"):`. When the request was not sampled, span()
+returns a shared no-op context, so unsampled requests pay only a
+thread-local lookup. Finished traces are kept in a ring buffer served by
+/debug/traces.
+"""
+import functools
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+_local = threading.local()
+_finished = deque(maxlen=int(os.environ.get('TRACE_BUFFER_SIZE', 256)))
+_finished_lock = threading.Lock()
+_sample_rate = float(os.environ.get('TRACE_SAMPLE_RATE', 0.0))
+
+def set_sample_rate(rate: float):
+    global _sample_rate
+    rate = float(rate)
+    if not math.isfinite(rate):
+        # min/max do not clamp NaN, and random() >= nan is always False
+        raise ValueError("sample rate must be a finite number")
+    _sample_rate = min(max(rate, 0.0), 1.0)
+
+def get_sample_rate() -> float:
+    return _sample_rate
+
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.perf_counter()
+        self.wall_time = time.time()
+        self.spans: List[Dict] = []
+        self.duration: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'timestamp': self.wall_time,
+            'durationUs': round(self.duration * 1e6, 1) if self.duration is not None else None,
+            'spans': self.spans
+        }
+
+class _Span:
+    def __init__(self, trace: Trace, stage: str):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace.spans.append({
+            'stage': self.stage,
+            'offsetUs': round((self.begin - self.trace.start) * 1e6, 1),
+            'durationUs': round((end - self.begin) * 1e6, 1)
+        })
+        return False
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(stage: str):
+    """Times a stage of the current trace; a no-op if this request is not traced."""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, stage)
+
+def traced(name: str):
+    """Decorator for views: traces a sampled fraction of calls under `name`."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _sample_rate or random.random() >= _sample_rate:
+                return view(*args, **kwargs)
+            trace = Trace(name)
+            _local.trace = trace
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _local.trace = None
+                trace.duration = time.perf_counter() - trace.start
+                with _finished_lock:
+                    _finished.append(trace)
+        return wrapper
+    return decorator
+
+def recent_traces(limit: int = 50) -> List[Dict]:
+    """The most recent finished traces, newest first."""
+    if limit <= 0:
+        return []
+    with _finished_lock:
+        traces = list(_finished)[-limit:]
+    return [trace.to_dict() for trace in reversed(traces)]
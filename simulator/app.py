@@ -1,12 +1,265 @@
 # simulator/app.py
-import time
+"""
+IoT load generator for the cold chain nodes.
+
+Pre-signs transactions for N virtual sensors (each with its own wallet and a
+correct nonce sequence) in a process pool, replays them against one or more
+nodes at a target rate (or as fast as possible) and reports accepted-tx
+throughput together with p50/p99/p999 admission latency.
+
+Examples:
+    python app.py --sensors 50 --per-sensor 200 --rate 500
+    python app.py --nodes http://localhost:8001,http://localhost:8002
+    python app.py --in-process 3 --sensors 20 --per-sensor 100
+"""
+import argparse
+import json
+import math
 import os
+import sys
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List
+
+# The simulator signs with the node's own Wallet/Transaction code so the
+# payloads are byte-for-byte what the node expects.
+NODE_SRC = os.environ.get(
+    'NODE_SRC',
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'node'))
+)
+sys.path.insert(0, NODE_SRC)
+
+from src.crypto.wallet import Wallet, hash_data
+from src.core.transaction import Transaction
+
+ACCEPTED_STATUS = 202
+
+# --- Pre-signing ---
+
+def sensor_wallet(seed: str, sensor_index: int) -> Wallet:
+    """Derives a deterministic wallet for a virtual sensor so runs are reproducible."""
+    private_key_bytes = hash_data(f"{seed}:sensor:{sensor_index}")
+    return Wallet(private_key_bytes=private_key_bytes)
+
+def _sign_sensor_batch(args) -> List[Dict]:
+    """
+    Signs `count` transactions for a single sensor, nonces start_nonce..start_nonce+count-1.
+    Lives at module level so it can be pickled into the process pool.
+    """
+    seed, sensor_index, count, start_nonce = args
+    wallet = sensor_wallet(seed, sensor_index)
+    signed = []
+    for i in range(count):
+        reading = {
+            'sensor': sensor_index,
+            'temp': round(2.0 + (sensor_index * 7 + i) % 60 / 10.0, 1),
+            'seq': i
+        }
+        tx = Transaction(
+            sender=wallet.public_key,
+            to=f"sensor-{sensor_index}",
+            amount=0,
+            nonce=start_nonce + i,
+            data=json.dumps(reading, sort_keys=True)
+        )
+        tx.sign(wallet)
+        signed.append(tx.to_dict())
+    return signed
+
+def presign(sensors: int, per_sensor: int, seed: str, start_nonce: int, workers: int) -> List[Dict]:
+    """
+    Pre-signs all transactions across a process pool and interleaves them
+    round-robin so every sensor's nonces are still submitted in order.
+    """
+    jobs = [(seed, i, per_sensor, start_nonce) for i in range(sensors)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batches = list(pool.map(_sign_sensor_batch, jobs))
+
+    interleaved = []
+    for i in range(per_sensor):
+        for batch in batches:
+            interleaved.append(batch[i])
+    return interleaved
+
+# --- Targets ---
+
+class HttpTarget:
+    """Submits transactions to a node over a pooled keep-alive HTTP session."""
+    def __init__(self, base_url: str, pool_size: int):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.name = base_url
+        self.url = f"{base_url.rstrip('/')}/tx/"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def submit(self, tx_data: Dict) -> int:
+        response = self.session.post(self.url, json=tx_data, timeout=10)
+        return response.status_code
+
+    def close(self):
+        self.session.close()
+
+class InProcessTarget:
+    """Submits transactions to a node created in this process via Flask's test client."""
+    def __init__(self, app):
+        self.name = f"in-process:{app.config['NODE_ID']}"
+        self.app = app
+
+    def submit(self, tx_data: Dict) -> int:
+        # Test clients are cheap and not shared across threads.
+        with self.app.test_client() as client:
+            return client.post('/tx/', json=tx_data).status_code
+
+    def close(self):
+        pass
+
+def start_in_process_cluster(size: int):
+    """
+    Creates `size` fully-meshed local nodes (each from `create_app()` with its
+    own temporary LevelDB) for fully offline runs.
+    """
+    from bench.cluster import Cluster
+
+    return Cluster(size)
+
+# --- Replay ---
+
+class Recorder:
+    """Collects per-request latency and status codes from worker threads."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.accepted_latencies: List[float] = []
+        self.status_counts: Dict[str, int] = {}
+
+    def record(self, status: str, latency: float):
+        with self.lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+            if status == str(ACCEPTED_STATUS):
+                self.accepted_latencies.append(latency)
+
+def replay(transactions: List[Dict], targets: List, rate: float, concurrency: int) -> Dict:
+    """
+    Replays the pre-signed transactions round-robin across targets.
+    With rate > 0 each transaction is released at its scheduled offset and
+    its latency is measured from that offset, so time spent waiting for a
+    free worker counts (no coordinated omission). With rate <= 0 the workers
+    submit as fast as they can and latency is measured from the send.
+    """
+    recorder = Recorder()
+    start = time.perf_counter()
+
+    def send(i: int, tx_data: Dict):
+        if rate > 0:
+            t0 = start + i / rate
+            delay = t0 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            t0 = time.perf_counter()
+        target = targets[i % len(targets)]
+        try:
+            status = str(target.submit(tx_data))
+        except Exception as e:
+            status = type(e).__name__
+        recorder.record(status, time.perf_counter() - t0)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i, tx_data in enumerate(transactions):
+            pool.submit(send, i, tx_data)
+
+    elapsed = time.perf_counter() - start
+    return summarize(recorder, elapsed, len(transactions))
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(recorder: Recorder, elapsed: float, sent: int) -> Dict:
+    latencies = sorted(recorder.accepted_latencies)
+    accepted = len(latencies)
+    return {
+        'sent': sent,
+        'accepted': accepted,
+        'statusCounts': recorder.status_counts,
+        'elapsedSeconds': round(elapsed, 3),
+        'acceptedTps': round(accepted / elapsed, 1) if elapsed > 0 else 0.0,
+        'latencyMs': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 3),
+            'p99': round(percentile(latencies, 0.99) * 1000, 3),
+            'p999': round(percentile(latencies, 0.999) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+def print_report(report: Dict, targets: List):
+    print("\n" + "=" * 50)
+    print("          Load Generator Report")
+    print("=" * 50)
+    print(f"Targets:        {', '.join(t.name for t in targets)}")
+    print(f"Sent:           {report['sent']}")
+    print(f"Accepted:       {report['accepted']}")
+    print(f"Status counts:  {report['statusCounts']}")
+    print(f"Elapsed:        {report['elapsedSeconds']} s")
+    print(f"Accepted TPS:   {report['acceptedTps']}")
+    latency = report['latencyMs']
+    print(f"Latency (ms):   p50={latency['p50']}  p99={latency['p99']}  p999={latency['p999']}  max={latency['max']}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Signed-transaction load generator for cold chain nodes.")
+    parser.add_argument('--nodes', default=os.environ.get('NODE_URL', 'http://localhost:8001'),
+                        help="Comma-separated node base URLs (default: $NODE_URL).")
+    parser.add_argument('--in-process', type=int, nargs='?', const=1, default=0, metavar='N',
+                        help="Start N nodes in this process and target them instead of --nodes.")
+    parser.add_argument('--sensors', type=int, default=int(os.environ.get('SENSORS', 10)))
+    parser.add_argument('--per-sensor', type=int, default=int(os.environ.get('TX_PER_SENSOR', 100)))
+    parser.add_argument('--rate', type=float, default=float(os.environ.get('TARGET_RATE', 0)),
+                        help="Target submissions per second; 0 means as fast as possible.")
+    parser.add_argument('--concurrency', type=int, default=int(os.environ.get('CONCURRENCY', 32)),
+                        help="Number of in-flight requests (also the HTTP pool size per node).")
+    parser.add_argument('--sign-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--start-nonce', type=int, default=0)
+    parser.add_argument('--seed', default=os.environ.get('LOADGEN_SEED', 'coldchain'))
+    parser.add_argument('--json', dest='json_out', help="Also write the report as JSON to this path.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print(f"✅ Pre-signing {args.sensors * args.per_sensor} transactions "
+          f"for {args.sensors} sensors on {args.sign_workers} processes...")
+    t0 = time.perf_counter()
+    transactions = presign(args.sensors, args.per_sensor, args.seed, args.start_nonce, args.sign_workers)
+    print(f"Signed in {time.perf_counter() - t0:.2f} s.")
+
+    cluster = None
+    if args.in_process:
+        cluster = start_in_process_cluster(args.in_process)
+        targets = [InProcessTarget(app) for app in cluster.apps]
+    else:
+        targets = [HttpTarget(url, args.concurrency) for url in args.nodes.split(',') if url]
+
+    rate_label = f"{args.rate:g} tx/s" if args.rate > 0 else "max rate"
+    print(f"Replaying at {rate_label} with {args.concurrency} in-flight requests...")
+    try:
+        report = replay(transactions, targets, args.rate, args.concurrency)
+    finally:
+        for target in targets:
+            target.close()
+        if cluster:
+            cluster.close()
 
-print("✅ IoT Simulator started.")
-print(f"Targeting node URL: {os.environ.get('NODE_URL', 'Not set')}")
+    print_report(report, targets)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
 
-# In future phases, this will generate and send transactions.
-# For now, it just runs and prints a message every 30 seconds.
-while True:
-    print("Simulator is alive and well...")
-    time.sleep(30)
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import { expect } from "chai";
+import { network } from "hardhat";
+
+const { ethers } = await network.connect();
+
+const ROOT = ethers.keccak256(ethers.toUtf8Bytes("readings"));
+
+describe("ColdChain.submitWindowSummary", function () {
+  async function deployWithShipment() {
+    const [manufacturer, oracle, other] = await ethers.getSigners();
+    const coldChain = await ethers.deployContract("ColdChain", [oracle.address]);
+    await coldChain.createShipment("SHIP001", "Vaccines");
+    return { coldChain, manufacturer, oracle, other };
+  }
+
+  it("Should store an in-range summary and keep the shipment status", async function () {
+    const { coldChain, oracle } = await deployWithShipment();
+
+    await expect(coldChain.connect(oracle).submitWindowSummary("SHIP001", 100, 400, 3, 7, 512, 30, ROOT))
+      .to.emit(coldChain, "WindowSummarized")
+      .withArgs("SHIP001", 100n, 400n, 3n, 7n, 30n, ROOT);
+
+    expect(await coldChain.getWindowSummaryCount("SHIP001")).to.equal(1n);
+    const summary = await coldChain.getWindowSummary("SHIP001", 0);
+    expect(summary.meanTempCenti).to.equal(512n);
+    expect(summary.readingsRoot).to.equal(ROOT);
+    expect(await coldChain.getShipmentStatus("SHIP001")).to.equal("Created");
+  });
+
+  it("Should mark the shipment Compromised when the window breaches a limit", async function () {
+    const { coldChain, manufacturer, oracle, other } = await deployWithShipment();
+
+    await expect(coldChain.connect(oracle).submitWindowSummary("SHIP001", 100, 400, 4, 9, 650, 30, ROOT))
+      .to.emit(coldChain, "FaultDetected")
+      .withArgs("SHIP001", 9n, manufacturer.address);
+    expect(await coldChain.getShipmentStatus("SHIP001")).to.equal("Compromised");
+
+    // A second breaching window does not report the fault again
+    await expect(coldChain.connect(oracle).submitWindowSummary("SHIP001", 400, 700, 1, 5, 300, 30, ROOT))
+      .to.not.emit(coldChain, "FaultDetected");
+
+    await expect(coldChain.transferCustody("SHIP001", other.address))
+      .to.be.revertedWith("Shipment is compromised and cannot be transferred");
+  });
+
+  it("Should reject inconsistent summaries", async function () {
+    const { coldChain, oracle } = await deployWithShipment();
+    const asOracle = coldChain.connect(oracle);
+
+    await expect(asOracle.submitWindowSummary("SHIP001", 100, 400, 3, 7, 500, 0, ROOT))
+      .to.be.revertedWith("Invalid window summary");
+    await expect(asOracle.submitWindowSummary("SHIP001", 100, 400, 7, 3, 500, 30, ROOT))
+      .to.be.revertedWith("Invalid window summary");
+    await expect(asOracle.submitWindowSummary("SHIP001", 400, 100, 3, 7, 500, 30, ROOT))
+      .to.be.revertedWith("Window ends before it starts");
+    await expect(asOracle.submitWindowSummary("SHIP001", 100, 400, 3, 7, 299, 30, ROOT))
+      .to.be.revertedWith("Mean outside min/max");
+    await expect(asOracle.submitWindowSummary("SHIP001", 100, 400, 3, 7, 701, 30, ROOT))
+      .to.be.revertedWith("Mean outside min/max");
+  });
+
+  it("Should only accept summaries from the oracle for existing shipments", async function () {
+    const { coldChain, oracle, other } = await deployWithShipment();
+
+    await expect(coldChain.connect(other).submitWindowSummary("SHIP001", 100, 400, 3, 7, 500, 30, ROOT))
+      .to.be.revertedWith("Only IoT Oracle can call this function");
+    await expect(coldChain.connect(oracle).submitWindowSummary("SHIP404", 100, 400, 3, 7, 500, 30, ROOT))
+      .to.be.revertedWith("Shipment does not exist");
+  });
+});
@@ -1,6 +1,7 @@
 # test_sign.py
 import sys
 sys.path.insert(0, './node/src') # Add path to our crypto module
+sys.path.insert(0, './node') # wallet.py imports src.telemetry
 from crypto.wallet import Wallet, hash_data, sign_data
 
 # --- PASTE YOUR PRIVATE KEY FROM STEP 3 HERE ---